@@ -1,12 +1,18 @@
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 from textual import work, on
 from textual.app import App, ComposeResult
+from textual.binding import Binding
 from textual.widgets import Footer, Label, DataTable, SelectionList, Input
-from dromadaire.widgets import AddressWidget
+from dromadaire.widgets import AddressWidget, SyncedDataTable, VirtualTable, format_address
 from textual.containers import Horizontal, Container, Vertical
 from textual.screen import ModalScreen
 from textual.reactive import reactive
-from typing import List, Tuple
+from textual.worker import get_current_worker
+from typing import List, Optional, Tuple
+from dromadaire.metrics import pool_weekly_emissions, token_units
 from dromadaire.state import state
 
 # Load environment variables from .env file
@@ -32,15 +38,58 @@ class AppHeader(Container):
 class Pools(Container):
     """Left panel showing trading pairs"""
 
+    BINDINGS = [
+        Binding("p", "sort('pool')", "Sort by pool", show=False),
+        Binding("t", "sort('tvl')", "Sort by TVL", show=False),
+        Binding("a", "sort('apr')", "Sort by APR", show=False),
+    ]
+
+    # Sort column of each table column that can be sorted on
+    SORT_COLUMNS = ["pool", "tvl", "apr"]
+
+    # Seconds typing has to pause before a search runs
+    search_debounce: float = 0.1
+    # Past this many rows pools are shown in a VirtualTable instead of the DataTable
+    virtual_table_threshold: int = 5000
+    # Number of formatted pool rows kept for reuse across filtering and sorting
+    max_cached_rows: int = 20000
+    # Rows above and below the cursor whose on-chain details are prefetched
+    details_prefetch_rows: int = 2
+
     def __init__(self):
         super().__init__(id="trading-pairs-panel")
         self.search_visible = False
-        self.all_pools = []
+        # Current sort as (column, descending), None keeps the loaded order
+        self.sort: Optional[Tuple[str, bool]] = None
+        self.search_timer = None
+        self.search_typed_at = 0.0
+        # Seconds from the last keystroke to the search results being rendered
+        self.last_search_latency: Optional[float] = None
+        # Formatted rows by (LP address, pool data version, price version), least recently used first
+        self.formatted_rows: OrderedDict[Tuple[str, int, int], tuple] = OrderedDict()
+        # Latest highlighted pool waiting to be shown in the details view
+        self.pending_details_pool = None
+        self.pool_details: Optional["PoolDetailsView"] = None
+        # Pools in the order they are shown in the active table
+        self.shown_pools = []
+
+    @property
+    def all_pools(self):
+        """Pools of all selected chains, as held by the app state"""
+        return self.app.state.pools
     
     def compose(self) -> ComposeResult:
         with Vertical():
-            yield Input(placeholder="Search pools...", id="pools-search", classes="hidden")
-            yield DataTable(id="pools-table")
+            yield Input(placeholder="Search pools... (e.g. usdc chain:base tvl>1m sort:-apr)", id="pools-search", classes="hidden")
+            yield SyncedDataTable(id="pools-table")
+            yield VirtualTable(
+                columns=[("Pool", 32), ("TVL", 24), ("APR", 8), ("LP Address", 14)],
+                row_key=lambda pool: pool.lp,
+                row_cells=self.format_pool_row,
+                id="pools-virtual-table",
+                classes="hidden",
+            )
+            yield Label("", id="pools-status", classes="hidden")
     
     def on_mount(self) -> None:
         table = self.query_one("#pools-table", DataTable)
@@ -57,24 +106,41 @@ class Pools(Container):
             self.search_visible = False
             # Clear search and show all pools
             search_input.value = ""
-            self.update_table_with_pools(self.all_pools)
+            self.show_pools()
             # Focus back to table
-            self.query_one("#pools-table", DataTable).focus()
+            self.active_table().focus()
         else:
             search_input.remove_class("hidden")
             self.search_visible = True
             search_input.focus()
     
     def on_input_changed(self, event) -> None:
-        """Handle search input changes"""
+        """Handle search input changes once typing pauses"""
         if event.input.id == "pools-search":
+            self.search_typed_at = time.perf_counter()
+            if self.search_timer is not None:
+                self.search_timer.stop()
             query = event.value
-            if query:
-                app_state = self.app.state
-                filtered_pools = app_state.filter_pools(self.all_pools, query)
-                self.update_table_with_pools(filtered_pools)
-            else:
-                self.update_table_with_pools(self.all_pools)
+            self.search_timer = self.set_timer(self.search_debounce, lambda: self.search_pools(query))
+
+    @work(thread=True, exclusive=True, group="pool-search")
+    def search_pools(self, query: str) -> None:
+        """Filter pools off the event loop, a newer search cancels this one"""
+        filtered_pools = self.app.state.filter_pools(self.all_pools, query, sort=self.sort)
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(self.show_search_results, query, filtered_pools)
+
+    def show_search_results(self, query: str, pools) -> None:
+        """Show search results unless a newer query has been typed since"""
+        if query != self.query_one("#pools-search", Input).value:
+            return
+        self.update_table_with_pools(pools)
+        self.call_after_refresh(self.record_search_latency, self.search_typed_at)
+
+    def record_search_latency(self, typed_at: float) -> None:
+        """Log how long a search took to show up after the last keystroke"""
+        self.last_search_latency = time.perf_counter() - typed_at
+        self.log(f"Pool search rendered {self.last_search_latency * 1000:.1f}ms after the last keystroke")
     
     def on_key(self, event) -> None:
         """Handle key events"""
@@ -83,56 +149,139 @@ class Pools(Container):
             self.toggle_search()
             event.stop()
     
+    def active_table(self):
+        """The table currently showing pools"""
+        virtual_table = self.query_one("#pools-virtual-table", VirtualTable)
+        if virtual_table.has_class("hidden"):
+            return self.query_one("#pools-table", SyncedDataTable)
+        return virtual_table
+
     def update_table_with_pools(self, pools) -> None:
-        """Update DataTable with given pools"""
-        table = self.query_one("#pools-table", DataTable)
-        table.clear()
+        """Update the pools table with given pools, touching only rows that changed"""
+        table = self.query_one("#pools-table", SyncedDataTable)
+        virtual_table = self.query_one("#pools-virtual-table", VirtualTable)
+        had_focus = self.active_table().has_focus
+        self.shown_pools = pools
+
+        if len(pools) > self.virtual_table_threshold:
+            # Too many pools to render into DataTable cells: format only the rows in view
+            if table.row_count:
+                table.clear()
+            table.add_class("hidden")
+            virtual_table.remove_class("hidden")
+            virtual_table.set_rows(pools)
+        else:
+            if virtual_table.row_count:
+                virtual_table.set_rows([])
+            virtual_table.add_class("hidden")
+            table.remove_class("hidden")
+            # Use pool LP address as row key for easy lookup
+            table.sync_rows((pool.lp, self.format_pool_row(pool)) for pool in pools)
+
+        if had_focus:
+            self.active_table().focus()
+
+    def format_pool_row(self, pool) -> tuple:
+        """Format the table cells for a pool, reusing them until the pool's data changes"""
+        metrics = self.app.state.pool_metrics()
+        key = (pool.lp, self.app.state.pool_version(pool), metrics.price_version)
+        if key in self.formatted_rows:
+            self.formatted_rows.move_to_end(key)
+            return self.formatted_rows[key]
+
+        # Extract pool information
+        chain_name = pool.chain_name
+        token_a = pool.token0.symbol if pool.token0 else 'N/A'
+        token_b = pool.token1.symbol if pool.token1 else 'N/A'
         
-        for pool in pools:
-            # Extract pool information
-            chain_name = pool.chain_name
-            token_a = pool.token0.symbol if pool.token0 else 'N/A'
-            token_b = pool.token1.symbol if pool.token1 else 'N/A'
-            
-            # Calculate TVL from reserves
-            tvl = 0
-            if pool.reserve0 and pool.reserve1:
-                try:
-                    tvl = float(pool.reserve0.amount) + float(pool.reserve1.amount)
-                except (ValueError, AttributeError):
-                    tvl = 0
-
-            # Get LP address and format it
-            lp_address = getattr(pool, 'lp', '') or getattr(pool, 'address', '')
-            formatted_lp = AddressWidget().format_address(lp_address) if lp_address else "N/A"
-            
-            table.add_row(
-                f"[{chain_name}] {token_a} / {token_b}",
-                f"${tvl:,.2f}" if tvl > 0 else "N/A",
-                f"{pool.pool_fee:.2f}%" if pool.pool_fee else "N/A",
-                formatted_lp,
-                key=pool.lp  # Use pool LP address as row key for easy lookup
-            )
+        # USD TVL and fee plus emissions APR
+        metric = metrics.get(pool)
+        tvl, apr = metric.tvl, metric.apr
+
+        # Get LP address and format it
+        lp_address = getattr(pool, 'lp', '') or getattr(pool, 'address', '')
+        formatted_lp = format_address(lp_address) if lp_address else "N/A"
+        
+        row = (
+            f"[{chain_name}] {token_a} / {token_b}",
+            f"${tvl:,.2f}" if tvl > 0 else "N/A",
+            f"{apr:.2f}%" if apr > 0 else "N/A",
+            formatted_lp,
+        )
+        self.formatted_rows[key] = row
+        if len(self.formatted_rows) > self.max_cached_rows:
+            self.formatted_rows.popitem(last=False)
+        return row
     
+    def show_pending_chains(self, chain_ids) -> None:
+        """Show which chains are still loading below the table"""
+        status = self.query_one("#pools-status", Label)
+        if chain_ids:
+            chain_names = [self.app.state.chain_name(chain_id) for chain_id in chain_ids]
+            status.update(f"⏳ Loading pools from {', '.join(sorted(chain_names))}...")
+            status.remove_class("hidden")
+        else:
+            status.add_class("hidden")
+
+    def action_sort(self, column: str) -> None:
+        """Sort pools on a column, or reverse the order if they already are"""
+        if self.sort and self.sort[0] == column:
+            self.sort = (column, not self.sort[1])
+        else:
+            # Biggest numbers first, names alphabetically
+            self.sort = (column, column != "pool")
+        self.show_pools()
+
+    @on(DataTable.HeaderSelected)
+    @on(VirtualTable.HeaderSelected)
+    def on_header_selected(self, event) -> None:
+        """Sort on a column when its header is clicked"""
+        if event.column_index < len(self.SORT_COLUMNS):
+            self.action_sort(self.SORT_COLUMNS[event.column_index])
+
+    def show_pools(self) -> None:
+        """Show the loaded pools, narrowed down by the active search and sorted"""
+        query = self.query_one("#pools-search", Input).value
+        self.update_table_with_pools(self.app.state.filter_pools(self.all_pools, query, sort=self.sort))
+
     @work(exclusive=True)
-    async def load_pool_data(self) -> None:
-        """Update the DataTable with pools data"""
+    async def load_pool_data(self, chain_ids: Optional[List[str]] = None) -> None:
+        """Stream pools into the pools table as each chain finishes loading
+        
+        Only `chain_ids` are fetched when given, pools of other chains stay as they are.
+        """
+        app_state = self.app.state
+        pending = set(chain_ids) if chain_ids is not None else {chain_id for chain_id, _ in app_state.selected_chains}
+        table = self.active_table()
         try:
-            table = self.query_one("#pools-table", DataTable)
-            table.loading = True
-            table.clear()
+            table.loading = not table.row_count
+            self.show_pending_chains(pending)
 
-            app_state = self.app.state
-            pools = await app_state.load_pools()
-            self.all_pools = pools  # Store all pools for filtering
+            async for chunk in app_state.iter_pools(chain_ids):
+                if not chunk.stale:
+                    pending.discard(chunk.chain_id)
+                if chunk.error is not None:
+                    self.show_error(f"{app_state.chain_name(chunk.chain_id)}: {chunk.error}")
+                else:
+                    # Respect an active search while rows stream in
+                    self.show_pools()
 
-            self.update_table_with_pools(pools)
+                if self.all_pools:
+                    table.loading = False
+                table = self.active_table()
+                self.show_pending_chains(pending)
         except Exception as e:
             self.show_error(str(e))
         finally:
             table.loading = False
-            # Set focus on the DataTable after pools are loaded
-            table.focus()
+            self.show_pending_chains(set())
+            self.finish_loading()
+
+    def finish_loading(self) -> None:
+        """Leave the loading state and focus the table once pools are loaded"""
+        table = self.active_table()
+        table.loading = False
+        table.focus()
     
     def show_error(self, error: str) -> None:
         """Show error message"""
@@ -140,10 +289,7 @@ class Pools(Container):
     
     def get_pool_by_lp_address(self, lp_address: str):
         """Get pool object by LP address"""
-        for pool in self.all_pools:
-            if pool.lp == lp_address:
-                return pool
-        return None
+        return self.app.state.pool_store.get(lp_address)
    
     @on(DataTable.RowHighlighted)
     def on_pool_highlighted(self, event: DataTable.RowHighlighted) -> None:
@@ -152,19 +298,62 @@ class Pools(Container):
             return  # Only handle our pools table
         
         # Get the highlighted pool using the row key (which is the LP address)
-        highlighted_pool = self.get_pool_by_lp_address(event.row_key)
+        highlighted_pool = self.get_pool_by_lp_address(event.row_key.value)
         
         if highlighted_pool:
-            # Get the pool details view and update it
-            pool_details = self.parent.query_one(PoolDetailsView)
-            pool_details.update_pool_details(highlighted_pool)
-        
+            self.show_pool_details(highlighted_pool)
+
+    @on(VirtualTable.RowHighlighted)
+    def on_virtual_pool_highlighted(self, event: VirtualTable.RowHighlighted) -> None:
+        """Show details of the pool highlighted in the virtual table"""
+        self.show_pool_details(event.row)
+
+    def show_pool_details(self, pool) -> None:
+        """Show a pool in the details view once the screen next refreshes
+
+        Highlights arriving faster than frames are drawn (holding an arrow key)
+        replace each other, so only the last one of each frame is rendered.
+        """
+        scheduled = self.pending_details_pool is not None
+        self.pending_details_pool = pool
+        if not scheduled:
+            self.call_after_refresh(self.flush_pool_details)
+
+    def flush_pool_details(self) -> None:
+        pool, self.pending_details_pool = self.pending_details_pool, None
+        if pool is None:
+            return
+        if self.pool_details is None:
+            self.pool_details = self.parent.query_one(PoolDetailsView)
+        self.pool_details.update_pool_details(pool)
+        self.pool_details.load_onchain_details(pool, self.neighbour_pools())
+
+    def neighbour_pools(self) -> list:
+        """Pools in the rows around the cursor, nearest first"""
+        row, pools = self.active_table().cursor_row, self.shown_pools
+        neighbours = []
+        for distance in range(1, self.details_prefetch_rows + 1):
+            for index in (row + distance, row - distance):
+                if 0 <= index < len(pools):
+                    neighbours.append(pools[index])
+        return neighbours
+
 
 class PoolDetailsView(Container):
     """Right sidebar with deposit/trading form"""
+
+    # Number of rendered pool details kept for reuse
+    max_cached_details: int = 1000
+
     def __init__(self):
         super().__init__(id="pool-details-view")
         self.current_pool = None
+        # Pool whose on-chain details could not be fetched
+        self.failed_pool = None
+        self.content_label: Optional[Label] = None
+        # Details text by (LP address, pool data version, price version, on-chain details, failed),
+        # least recently used first
+        self.rendered_details: OrderedDict[tuple, str] = OrderedDict()
     
     def compose(self) -> ComposeResult:
         with Vertical():
@@ -172,32 +361,111 @@ class PoolDetailsView(Container):
     
     def update_pool_details(self, pool) -> None:
         """Update the pool details view with selected pool information"""
+        if pool is self.current_pool:
+            return
         self.current_pool = pool
+        self.show_details()
+
+    def show_details(self) -> None:
+        """Render the current pool, with its on-chain details once they are loaded"""
+        pool = self.current_pool
+        details_text = self.render_pool_details(pool)
+        if pool.is_cl:
+            details_text += "\n\n" + self.render_onchain_details(pool)
         
+        # Update the content label
+        if self.content_label is None:
+            self.content_label = self.query_one("#pool-details-content", Label)
+        self.content_label.update(details_text)
+
+    @work(exclusive=True, group="pool-details")
+    async def load_onchain_details(self, pool, neighbours) -> None:
+        """Fetch on-chain details of the highlighted pool, then prefetch the pools around it"""
+        loader = self.app.state.pool_details
+        if not loader.has(pool):
+            try:
+                await loader.load(pool)
+            except Exception:
+                self.failed_pool = pool
+            if pool is self.current_pool:
+                self.show_details()
+        await loader.prefetch(neighbours)
+
+    def onchain_status(self, pool) -> str:
+        """What to show in place of on-chain details that are not loaded"""
+        return "unavailable" if pool is self.failed_pool else "loading..."
+
+    def render_onchain_details(self, pool) -> str:
+        """Tick and liquidity of a concentrated liquidity pool"""
+        details = self.app.state.pool_details.get(pool)
+        cl_state = details.cl_state if details else None
+        if cl_state is None:
+            return f"📐 Concentrated Liquidity: {self.onchain_status(pool)}"
+        details_text = f"""📐 Concentrated Liquidity:
+Tick: {cl_state.tick} (spacing {cl_state.tick_spacing})
+Liquidity: {cl_state.liquidity:,}"""
+        if cl_state.alm_total_supply is not None:
+            details_text += f"\nALM Supply: {cl_state.alm_total_supply:,.2f}"
+        return details_text
+
+    def render_epoch(self, pool, details) -> Tuple[str, str]:
+        """Gauge and fees lines of a pool's latest epoch"""
+        if details is None:
+            status = self.onchain_status(pool)
+            return f"Last Epoch: {status}", f"Last Epoch Fees: {status}"
+        epoch = details.epoch
+        if epoch is None:
+            return "Last Epoch: none yet", "Last Epoch Fees: none yet"
+
+        def amount_lines(amounts) -> str:
+            # Sugar leaves out amounts of tokens it does not know
+            return "".join(
+                f"\n  {amount.token.symbol}: {token_units(amount):,.4f}" for amount in amounts if amount is not None
+            )
+
+        def amounts_usd(amounts) -> float:
+            return sum(amount.amount_in_stable for amount in amounts if amount is not None)
+
+        emissions_symbol = pool.emissions_token.symbol if pool.emissions_token else ''
+        started = datetime.fromtimestamp(epoch.ts, timezone.utc)
+        gauge = f"""Last Epoch ({started:%b %d}):
+Votes: {epoch.votes / 10 ** 18:,.2f}
+Emissions: {epoch.emissions / 10 ** 18:,.2f} {emissions_symbol}
+Incentives: ${amounts_usd(epoch.incentives):,.2f}{amount_lines(epoch.incentives)}"""
+        fees = f"Last Epoch Fees: ${amounts_usd(epoch.fees):,.2f}{amount_lines(epoch.fees)}"
+        return gauge, fees
+
+    def render_pool_details(self, pool) -> str:
+        """Details text of a pool, reused until the pool's data, prices or on-chain details change"""
+        metrics = self.app.state.pool_metrics()
+        details = self.app.state.pool_details.get(pool)
+        key = (pool.lp, self.app.state.pool_version(pool), metrics.price_version, details, pool is self.failed_pool)
+        if key in self.rendered_details:
+            self.rendered_details.move_to_end(key)
+            return self.rendered_details[key]
+
         # Format pool information
         chain_name = pool.chain_name
         token_a = pool.token0.symbol if pool.token0 else 'N/A'
         token_b = pool.token1.symbol if pool.token1 else 'N/A'
         
-        # Calculate TVL
-        tvl = 0
-        if pool.reserve0 and pool.reserve1:
-            try:
-                tvl = pool.tvl if hasattr(pool, 'tvl') else (float(pool.reserve0.amount) + float(pool.reserve1.amount))
-            except (ValueError, AttributeError):
-                tvl = 0
+        # USD TVL and APRs as shown in the pools table
+        metric = metrics.get(pool)
+        emissions_symbol = pool.emissions_token.symbol if pool.emissions_token else ''
+        staked = pool.gauge_total_supply / pool.total_supply if pool.total_supply else 0
+        epoch_gauge, epoch_fees = self.render_epoch(pool, details)
         
         # Format details text
         details_text = f"""🏊 {token_a} / {token_b}
 📍 Chain: {chain_name}
-💰 TVL: ${tvl:,.2f}
+💰 TVL: ${metric.tvl:,.2f}
 📊 Pool Fee: {pool.pool_fee:.2f}%
 🏭 Type: {'Stable' if pool.is_stable else 'Volatile'}
-📍 LP Address: {AddressWidget().format_address(pool.lp)}
+📍 LP Address: {format_address(pool.lp)}
 
 💎 Token Details:
-{token_a}: {AddressWidget().format_address(pool.token0.token_address)}...
-{token_b}: {AddressWidget().format_address(pool.token1.token_address)}...
+{token_a}: {format_address(pool.token0.token_address)}...
+{token_b}: {format_address(pool.token1.token_address)}...
 
 📈 Reserves:
 {token_a}: {pool.reserve0.amount:,.2f}
@@ -206,11 +474,23 @@ class PoolDetailsView(Container):
 🎯 Pool Info:
 Factory: {pool.factory[:10]}...
 Total Supply: {pool.total_supply:,.2f}
-Decimals: {pool.decimals}"""
-        
-        # Update the content label
-        content_label = self.query_one("#pool-details-content", Label)
-        content_label.update(details_text)
+Decimals: {pool.decimals}
+
+⛽ Gauge:
+Staked: {staked:.2%}
+Emissions: {pool_weekly_emissions(pool):,.2f} {emissions_symbol} / week
+Emissions APR: {metric.emissions_apr:.2f}%
+{epoch_gauge}
+
+💸 Fees This Epoch:
+{token_a}: {token_units(pool.token0_fees, pool.token0):,.4f}
+{token_b}: {token_units(pool.token1_fees, pool.token1):,.4f}
+Fee APR: {metric.fee_apr:.2f}%
+{epoch_fees}"""
+        self.rendered_details[key] = details_text
+        if len(self.rendered_details) > self.max_cached_details:
+            self.rendered_details.popitem(last=False)
+        return details_text
 
 class TradingInterface(Container):
     """Main trading interface layout"""
@@ -239,7 +519,7 @@ class ChainSelectionScreen(ModalScreen):
             selected_chains = selection_list.selected
             self.dismiss(selected_chains)
         elif event.key == "escape":
-            self.dismiss([])
+            self.dismiss(None)
 
 class WalletScreen(ModalScreen):
     """Modal screen for wallet balances"""
@@ -259,7 +539,7 @@ class WalletScreen(ModalScreen):
     
     @work(exclusive=True)
     async def load_balances(self) -> None:
-        """Load wallet balances"""
+        """Load wallet balances, showing each batch as soon as it is read"""
         content = self.query_one("#wallet-content", Container)
         
         # Check if wallet is connected
@@ -268,38 +548,58 @@ class WalletScreen(ModalScreen):
             content.mount(Label("No wallet connected"))
             return
         
-        # Show loading state
-        content.mount(Label("Loading balances..."))
+        # Show loading state, rows are added as balances come in
+        status = Label("Loading balances...", id="wallet-status")
+        table = DataTable(id="balances-table")
+        table.add_columns("Token", "Balance", "Chain", "Value (USD)")
+        content.mount(status, table)
+        
+        # Running USD total of every chain, and chains still loading or failed
+        totals = {chain.chain_id: 0.0 for chain in app_state.chains}
+        pending, failed = set(totals), set()
         
         try:
-            # Get balances from state
-            balances = await app_state.get_balances()
-            self.balances = balances
+            async for chunk in app_state.iter_balances():
+                for balance in chunk.balances:
+                    self.balances.append(balance)
+                    totals[chunk.chain_id] = totals.get(chunk.chain_id, 0.0) + balance.balance_stable
+                    table.add_row(*self.format_balance(balance))
+                if chunk.done:
+                    pending.discard(chunk.chain_id)
+                    if chunk.error:
+                        failed.add(chunk.chain_id)
+                status.update(self.format_status(totals, pending, failed))
             
-            # Clear loading message
-            content.remove_children()
-            
-            if not balances:
-                content.mount(Label("No balances found"))
-                return
-            
-            # Create balance table
-            table = DataTable(id="balances-table")
-            table.add_columns("Token", "Balance", "Chain", "Value (USD)")
-            
-            for balance in balances:
-                token_symbol = balance.token.symbol
-                token_balance = f"{balance.balance:,.6f}"
-                chain_name = balance.token.chain_name
-                usd_value = f"${balance.balance_stable:,.2f}" if balance.balance_stable > 0 else "N/A"
-                
-                table.add_row(token_symbol, token_balance, chain_name, usd_value)
-            
-            content.mount(table)
+            if not self.balances:
+                table.remove()
+                status.update("No balances found")
             
         except Exception as e:
             content.remove_children()
             content.mount(Label(f"Error loading balances: {str(e)}"))
+
+    def format_balance(self, balance) -> tuple:
+        """Format the table cells of a balance"""
+        token_symbol = balance.token.symbol
+        token_balance = f"{balance.balance:,.6f}"
+        chain_name = balance.token.chain_name
+        usd_value = f"${balance.balance_stable:,.2f}" if balance.balance_stable > 0 else "N/A"
+        return token_symbol, token_balance, chain_name, usd_value
+
+    def format_status(self, totals, pending, failed) -> str:
+        """Grand total, per-chain totals and chains that are still loading or failed"""
+        chain_name = self.app.state.chain_name
+        parts = [f"Total: ${sum(totals.values()):,.2f}"]
+        parts += [
+            f"{chain_name(chain_id)} ${total:,.2f}"
+            for chain_id, total in totals.items()
+            if chain_id not in pending and chain_id not in failed
+        ]
+        if pending:
+            parts.append("⏳ " + ", ".join(sorted(chain_name(chain_id) for chain_id in pending)))
+        if failed:
+            parts.append("⚠️ Failed: " + ", ".join(sorted(chain_name(chain_id) for chain_id in failed)))
+        return " · ".join(parts)
     
     def on_key(self, event) -> None:
         if event.key == "escape":
@@ -329,6 +629,11 @@ class DromadaireApp(App):
     def on_mount(self) -> None:
         self.selected_chains = self.state.default_chains.copy()
 
+    async def on_unmount(self) -> None:
+        """Close chain connections and finish writing pool snapshots on exit"""
+        await self.state.connections.close_all()
+        await self.state.pool_cache.flush()
+
     def compose(self) -> ComposeResult:
         yield AppHeader(wallet_address=self.state.wallet_address)
         yield TradingInterface()
@@ -342,7 +647,10 @@ class DromadaireApp(App):
     
     def action_show_chain_selection(self) -> None:
         """Show the chain selection modal."""
-        def handle_chain_selection(selected_chains): self.selected_chains = self.state.select_chains(selected_chains)
+        def handle_chain_selection(selected_chains):
+            # Escape cancels without touching the selection
+            if selected_chains is not None:
+                self.selected_chains = self.state.select_chains(selected_chains)
         self.push_screen(ChainSelectionScreen(selected_chains=self.selected_chains, supported_chains=self.state.supported_chains), handle_chain_selection)
     
     def action_show_wallet(self) -> None:
@@ -356,11 +664,18 @@ class DromadaireApp(App):
     
     async def watch_selected_chains(self, chains: List[Tuple[str, str]]) -> None:
         """Called when selected_chains changes"""
-        # Sync with app state
+        # Sync with app state: rows of deselected chains are dropped locally
+        pools_widget = self.query_one(Pools)
+        pools_widget.show_pools()
         if chains:
             self.notify(f"Selected chains: {', '.join([chain_name for _, chain_name in chains])}")
-            pools_widget = self.query_one(Pools)
-            pools_widget.load_pool_data()
+            # Only fetch chains that were just added (or failed to load before)
+            unloaded_chains = self.state.unloaded_chains()
+            if unloaded_chains:
+                pools_widget.load_pool_data(unloaded_chains)
+            else:
+                # Every selected chain is loaded already, nothing will clear the loading state
+                pools_widget.finish_loading()
         else:
             self.notify("No chains selected")
     
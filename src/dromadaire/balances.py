@@ -0,0 +1,131 @@
+import asyncio
+from dataclasses import replace
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+from dromadaire.confiture import AsyncChain, BalanceCalls, Price, Token, TokenBalance
+from dromadaire.pipeline import AdaptiveLimit, chain_limits, run_pipelined
+
+TokenLister = Callable[[], Awaitable[List[Token]]]
+TokenPricer = Callable[[List[Token]], Awaitable[List[Price]]]
+
+
+class BalanceTracker:
+    """Wallet balances on one chain, kept up to date from ERC-20 Transfer logs
+
+    The first refresh sweeps every listed token. Later refreshes pull the
+    Transfer logs to or from the wallet since the last scanned block and only
+    re-read the tokens that show up in them, plus ETH which moves with every
+    transaction's gas. Ranges over `max_log_blocks` blocks, more than RPC
+    endpoints scan in one request, fall back to a full sweep, and so does the
+    refresh after one that could not read every balance.
+    """
+
+    max_log_blocks: int = 10_000
+
+    def __init__(self, chain_id: str):
+        self.chain_id = chain_id
+        self.owner: Optional[str] = None
+        self.last_block: Optional[int] = None
+        # Non-zero balances by lowercased token address
+        self.balances: Dict[str, TokenBalance] = {}
+        self._lock = asyncio.Lock()
+
+    async def refresh(
+        self,
+        chain: AsyncChain,
+        get_tokens: TokenLister,
+        get_prices: TokenPricer,
+        on_batch: Optional[Callable[[List[TokenBalance]], None]] = None,
+        limit: Optional[AdaptiveLimit] = None,
+        calls: Optional[BalanceCalls] = None,
+    ) -> List[TokenBalance]:
+        """Current balances of the chain's account
+
+        `on_batch` is called with balances as soon as they are read, reads
+        keep within `limit` and use the prepared `calls`, see `get_token_balances`.
+        """
+        async with self._lock:
+            owner = chain.account.address
+            latest = await chain.web3.eth.block_number
+            changed, complete = None, True
+            if owner == self.owner and self.last_block is not None and latest - self.last_block <= self.max_log_blocks:
+                try:
+                    changed = await chain.get_transfer_tokens(owner, self.last_block + 1, latest)
+                except Exception:
+                    # Endpoints without log access still get balances, the slow way
+                    changed = None
+
+            if changed is None:
+                failed_batches = []
+                balances = await chain.get_token_balances(
+                    owner,
+                    get_tokens=get_tokens,
+                    get_prices=get_prices,
+                    on_batch=on_batch,
+                    on_failure=lambda batch, error: failed_batches.append(batch),
+                    limit=limit,
+                    calls=calls,
+                )
+                # Logs only tell which balances changed, not the ones a failed batch never read
+                complete = not failed_batches
+                self.balances = {balance.token.token_address.lower(): balance for balance in balances}
+            else:
+                complete = await self.update(chain, owner, changed, get_tokens, get_prices, limit, calls)
+                if on_batch:
+                    on_batch(list(self.balances.values()))
+            self.owner, self.last_block = owner, latest if complete else None
+            return list(self.balances.values())
+
+    async def update(
+        self,
+        chain: AsyncChain,
+        owner: str,
+        changed: Set[str],
+        get_tokens: TokenLister,
+        get_prices: TokenPricer,
+        limit: Optional[AdaptiveLimit] = None,
+        calls: Optional[BalanceCalls] = None,
+    ) -> bool:
+        """Re-read ETH and the `changed` tokens, and reprice every other balance
+
+        Changed tokens are read in batches like a sweep's. Balances that could
+        not be read keep their previous value, repriced, and False is returned
+        so that the next refresh sweeps again.
+        """
+        changed_tokens = [
+            token for token in await get_tokens()
+            if token.listed and token.token_address != 'ETH' and token.token_address.lower() in changed
+        ]
+        held_tokens = [balance.token for balance in self.balances.values()]
+        price_lookup = {
+            price.token.token_address: price.price for price in await get_prices(held_tokens + changed_tokens)
+        }
+
+        limits = chain_limits(chain.chain_id)
+        limit = limit or AdaptiveLimit.for_chain(limits)
+        batches = [changed_tokens[i:i + limits.batch_size] for i in range(0, len(changed_tokens), limits.batch_size)]
+        results = await run_pipelined(
+            batches, lambda batch: chain.process_token_batch(batch, owner, price_lookup, calls), limit
+        )
+        # Keys of the balances that were read, whether or not any is left
+        read, updated, complete = set(), [], True
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                complete = False
+            else:
+                read.update(token.token_address.lower() for token in batch)
+                updated.extend(balance for balance in result if balance.balance > 0)
+        try:
+            updated.append(await chain.get_eth_balance(owner, price_lookup))
+            read.add("eth")
+        except Exception:
+            complete = False
+
+        balances = {
+            key: replace(balance, price_stable=price_lookup.get(balance.token.token_address, balance.price_stable))
+            for key, balance in self.balances.items()
+            if key not in read
+        }
+        for balance in updated:
+            balances[balance.token.token_address.lower()] = balance
+        self.balances = balances
+        return complete
@@ -0,0 +1,249 @@
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+from dromadaire.confiture import Amount, LiquidityPool, Price, Token
+
+T = TypeVar("T")
+
+# Bump whenever the layout of cached entries changes so old files are ignored
+SCHEMA_VERSION = 3
+
+# Types of the values JSON decodes to that cached records hold as they are
+PLAIN_TYPES = frozenset((str, int, float, bool, type(None)))
+
+# Pool fields holding a token or an amount, every other pool field holds a plain value
+POOL_TOKEN_FIELDS = ("token0", "token1", "emissions_token")
+POOL_AMOUNT_FIELDS = ("reserve0", "reserve1", "token0_fees", "token1_fees", "emissions", "weekly_emissions")
+
+
+def cache_dir() -> Path:
+    """Directory holding Dromadaire's on-disk caches
+
+    Defaults to `$XDG_CACHE_HOME/dromadaire` and can be overridden with `DROMADAIRE_CACHE_DIR`.
+    """
+    if os.environ.get("DROMADAIRE_CACHE_DIR"):
+        return Path(os.environ["DROMADAIRE_CACHE_DIR"])
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "dromadaire"
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Write a file so readers never see it half-written"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def read_entry(path: Path, chain_id: str, load: Callable[[dict], T]) -> Optional[T]:
+    """Read a cached entry for a chain and rebuild it with `load`, or None if there is no usable one"""
+    try:
+        entry = json.loads(path.read_bytes())
+        if entry["schema"] != SCHEMA_VERSION or entry["chain_id"] != chain_id:
+            return None
+        return load(entry)
+    except Exception:
+        # Missing, corrupt or written by an incompatible version: treat as a miss
+        return None
+
+
+def write_entry(path: Path, chain_id: str, fetched_at: float, dump: Callable[[], dict]) -> None:
+    """Store the cached entry for a chain with the data from `dump`, ignoring disks we can't write to"""
+    try:
+        entry = {"schema": SCHEMA_VERSION, "chain_id": chain_id, "fetched_at": fetched_at, **dump()}
+        write_atomic(path, json.dumps(entry, separators=(",", ":")).encode())
+    except (OSError, TypeError, ValueError):
+        # A read-only or full disk, or a record we can't store, should never break the app
+        pass
+
+
+def plain(value: Any) -> Any:
+    """A JSON scalar, anything else is not cached data"""
+    if type(value) in PLAIN_TYPES:
+        return value
+    raise ValueError(f"unexpected cached value {value!r}")
+
+
+def optional(convert: Callable[[Any], T]) -> Callable[[Any], Optional[T]]:
+    return lambda value: None if value is None else convert(value)
+
+
+@lru_cache(maxsize=None)
+def field_names(cls: type) -> Tuple[str, ...]:
+    return tuple(field.name for field in fields(cls))
+
+
+def dump_table(cls: type, records: Iterable[Any], **convert: Callable[[Any], Any]) -> Dict[str, list]:
+    """Field names of one of sugar's record types and a row of field values per record
+
+    Fields in `convert` are converted with it, every other field holds a plain value.
+    """
+    names = field_names(cls)
+    converters = [(name, convert.get(name, plain)) for name in names]
+    return {
+        "fields": list(names),
+        "rows": [[to_data(getattr(record, name)) for name, to_data in converters] for record in records],
+    }
+
+
+def load_table(cls: Callable[..., T], table: Any, **convert: Callable[[Any], Any]) -> List[T]:
+    """Records rebuilt from `dump_table` data, fields in `convert` are converted with it
+
+    Tables whose fields are not exactly the record's, or rows that do not hold
+    plain values for each of them, raise ValueError so that files changed on
+    disk or written for another version of sugar are never loaded. Field names
+    are checked once per table rather than once per record.
+    """
+    names = field_names(cls)
+    if not isinstance(table, dict) or table.get("fields") != list(names) or type(table.get("rows")) is not list:
+        raise ValueError(f"cached data does not match {cls.__name__}")
+    converters = [convert.get(name, plain) for name in names]
+    records = []
+    for row in table["rows"]:
+        if type(row) is not list or len(row) != len(converters):
+            raise ValueError(f"cached data does not match {cls.__name__}")
+        records.append(cls(*[from_data(value) for from_data, value in zip(converters, row)]))
+    return records
+
+
+def reference(records: List[T]) -> Callable[[Any], T]:
+    """Converter of a position in `records` to the record at that position"""
+    def load(position: Any) -> T:
+        if type(position) is not int or not 0 <= position < len(records):
+            raise ValueError(f"unexpected cached reference {position!r}")
+        return records[position]
+    return load
+
+
+def dump_pools(pools: List[LiquidityPool]) -> Dict[str, Dict[str, list]]:
+    """Tables of pools and of the tokens, prices and amounts they hold
+
+    Records are stored once, in their own table, and referred to by position.
+    """
+    tables: Dict[type, List[Any]] = {Token: [], Price: [], Amount: []}
+
+    def referrer(cls: type) -> Callable[[Any], int]:
+        records, positions = tables[cls], {}
+
+        def dump_reference(record: Any) -> int:
+            if not isinstance(record, cls):
+                raise ValueError(f"unexpected {cls.__name__} {record!r}")
+            if id(record) not in positions:
+                positions[id(record)] = len(records)
+                records.append(record)
+            return positions[id(record)]
+        return dump_reference
+
+    token, price, amount = optional(referrer(Token)), optional(referrer(Price)), optional(referrer(Amount))
+    pool_table = dump_table(LiquidityPool, pools, **{
+        **{name: token for name in POOL_TOKEN_FIELDS},
+        **{name: amount for name in POOL_AMOUNT_FIELDS},
+    })
+    # Amounts first, they add the prices they hold, which add their tokens
+    amount_table = dump_table(Amount, tables[Amount], token=token, price=price)
+    price_table = dump_table(Price, tables[Price], token=token)
+    return {
+        "tokens": dump_table(Token, tables[Token]),
+        "prices": price_table,
+        "amounts": amount_table,
+        "pools": pool_table,
+    }
+
+
+def load_pools(data: Dict[str, Any]) -> List[LiquidityPool]:
+    """Pools rebuilt from `dump_pools` data, sharing token, price and amount instances as the dumped pools did"""
+    tokens = load_table(Token, data["tokens"])
+    prices = load_table(Price, data["prices"], token=optional(reference(tokens)))
+    amounts = load_table(
+        Amount, data["amounts"], token=optional(reference(tokens)), price=optional(reference(prices))
+    )
+    return load_table(LiquidityPool, data["pools"], **{
+        **{name: optional(reference(tokens)) for name in POOL_TOKEN_FIELDS},
+        **{name: optional(reference(amounts)) for name in POOL_AMOUNT_FIELDS},
+    })
+
+
+@dataclass
+class PoolSnapshot:
+    """Pools of a single chain as they were at `fetched_at`"""
+    chain_id: str
+    fetched_at: float
+    pools: List[LiquidityPool]
+
+
+class PoolCache:
+    """Persistent per-chain pool snapshots"""
+
+    def __init__(self):
+        # Pending background writes by chain id
+        self._writes: Dict[str, asyncio.Task] = {}
+
+    def path(self, chain_id: str) -> Path:
+        return cache_dir() / f"pools-{chain_id}.json"
+
+    def load(self, chain_id: str) -> Optional[PoolSnapshot]:
+        """Load the last snapshot for a chain, or None if there is no usable one"""
+        return read_entry(self.path(chain_id), chain_id, lambda entry: PoolSnapshot(
+            chain_id=chain_id, fetched_at=float(entry["fetched_at"]), pools=load_pools(entry["pools"])
+        ))
+
+    def save(self, chain_id: str, pools: List[LiquidityPool]) -> PoolSnapshot:
+        """Store a fresh snapshot for a chain"""
+        snapshot = PoolSnapshot(chain_id=chain_id, fetched_at=time.time(), pools=pools)
+        write_entry(self.path(chain_id), chain_id, snapshot.fetched_at, lambda: {"pools": dump_pools(pools)})
+        return snapshot
+
+    def save_later(self, chain_id: str, pools: List[LiquidityPool]) -> None:
+        """Store a fresh snapshot for a chain from a worker thread, after the chain's pending write"""
+        previous = self._writes.get(chain_id)
+
+        async def write():
+            if previous is not None:
+                await asyncio.wait([previous])
+            await asyncio.to_thread(self.save, chain_id, pools)
+
+        def forget(task: asyncio.Task) -> None:
+            if self._writes.get(chain_id) is task:
+                del self._writes[chain_id]
+
+        task = asyncio.get_running_loop().create_task(write())
+        self._writes[chain_id] = task
+        task.add_done_callback(forget)
+
+    async def flush(self) -> None:
+        """Wait for pending background writes"""
+        while self._writes:
+            await asyncio.wait(list(self._writes.values()))
+
+
+@dataclass
+class TokenSnapshot:
+    """Tokens of a single chain as they were at `fetched_at`"""
+    chain_id: str
+    fetched_at: float
+    tokens: List[Token]
+
+
+class TokenCache:
+    """Persistent per-chain token lists"""
+
+    def path(self, chain_id: str) -> Path:
+        return cache_dir() / f"tokens-{chain_id}.json"
+
+    def load(self, chain_id: str) -> Optional[TokenSnapshot]:
+        """Load the last token list of a chain, or None if there is no usable one"""
+        return read_entry(self.path(chain_id), chain_id, lambda entry: TokenSnapshot(
+            chain_id=chain_id,
+            fetched_at=float(entry["fetched_at"]),
+            tokens=load_table(Token, entry["tokens"]),
+        ))
+
+    def save(self, snapshot: TokenSnapshot) -> None:
+        """Store the token list of a chain"""
+        write_entry(self.path(snapshot.chain_id), snapshot.chain_id, snapshot.fetched_at, lambda: {
+            "tokens": dump_table(Token, snapshot.tokens)
+        })
@@ -1,13 +1,15 @@
 import asyncio
 from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
 from sugar import AsyncChain
 from sugar.token import Token
 from sugar import get_async_chain, get_chain
-from sugar.pool import LiquidityPool, Amount
+from sugar.pool import LiquidityPool, LiquidityPoolEpoch, Amount
 from sugar.helpers import normalize_address
 from sugar.price import  Price
+from dromadaire.pipeline import AdaptiveLimit, chain_limits, is_rate_limited, run_pipelined
 
-get_async_chain, get_chain, normalize_address, LiquidityPool, Price, Amount
+get_async_chain, get_chain, normalize_address, LiquidityPool, LiquidityPoolEpoch, Price, Amount
 
 
 @dataclass
@@ -22,74 +24,308 @@ class TokenBalance:
         """Computed property for stable currency value"""
         return self.balance * self.price_stable
 
-# ERC-20 token ABI for balanceOf function
-ERC20_ABI = [
+@dataclass
+class ClPoolState:
+    """On-chain state of a concentrated liquidity pool"""
+    sqrt_price_x96: int
+    tick: int
+    tick_spacing: int
+    liquidity: int
+    # Total supply of the pool's ALM vault, None without one
+    alm_total_supply: Optional[float] = None
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+# ERC-20 token ABI for totalSupply function
+ERC20_SUPPLY_ABI = [
     {
         "constant": True,
-        "inputs": [{"name": "owner", "type": "address"}],
-        "name": "balanceOf",
+        "inputs": [],
+        "name": "totalSupply",
         "outputs": [{"name": "", "type": "uint256"}],
         "type": "function"
     }
 ]
 
+# Multicall3 is deployed at the same address on most EVM chains
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+# Multicall3 ABI for aggregate3, which lets every call fail on its own
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"name": "target", "type": "address"},
+                    {"name": "allowFailure", "type": "bool"},
+                    {"name": "callData", "type": "bytes"}
+                ],
+                "name": "calls",
+                "type": "tuple[]"
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"name": "success", "type": "bool"},
+                    {"name": "returnData", "type": "bytes"}
+                ],
+                "name": "returnData",
+                "type": "tuple[]"
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function"
+    }
+]
+
+# First four bytes of keccak256("balanceOf(address)")
+BALANCE_OF_SELECTOR = bytes.fromhex("70a08231")
+
+# keccak256("Transfer(address,address,uint256)"), the first topic of ERC-20 Transfer logs
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+
+# Concentrated liquidity pool ABI for its price, tick and liquidity
+CL_POOL_ABI = [
+    {
+        "inputs": [],
+        "name": "slot0",
+        "outputs": [
+            {"name": "sqrtPriceX96", "type": "uint160"},
+            {"name": "tick", "type": "int24"},
+            {"name": "observationIndex", "type": "uint16"},
+            {"name": "observationCardinality", "type": "uint16"},
+            {"name": "observationCardinalityNext", "type": "uint16"},
+            {"name": "unlocked", "type": "bool"}
+        ],
+        "stateMutability": "view",
+        "type": "function"
+    },
+    {
+        "inputs": [],
+        "name": "tickSpacing",
+        "outputs": [{"name": "", "type": "int24"}],
+        "stateMutability": "view",
+        "type": "function"
+    },
+    {
+        "inputs": [],
+        "name": "liquidity",
+        "outputs": [{"name": "", "type": "uint128"}],
+        "stateMutability": "view",
+        "type": "function"
+    }
+]
+
+
+async def get_cl_pool_state(self: AsyncChain, pool: LiquidityPool) -> ClPoolState:
+    """Read the current price, tick and liquidity of a concentrated liquidity pool
+    
+    Also reads the total supply of the pool's ALM vault when it has one.
+    """
+    contract = self.web3.eth.contract(address=self.web3.to_checksum_address(pool.lp), abi=CL_POOL_ABI)
+    calls = [
+        contract.functions.slot0().call(),
+        contract.functions.tickSpacing().call(),
+        contract.functions.liquidity().call(),
+    ]
+    if pool.alm and pool.alm.lower() != ZERO_ADDRESS:
+        alm = self.web3.eth.contract(address=self.web3.to_checksum_address(pool.alm), abi=ERC20_SUPPLY_ABI)
+        calls.append(alm.functions.totalSupply().call())
+    
+    slot0, tick_spacing, liquidity, *alm_supply = await asyncio.gather(*calls)
+    return ClPoolState(
+        sqrt_price_x96=slot0[0],
+        tick=slot0[1],
+        tick_spacing=tick_spacing,
+        liquidity=liquidity,
+        alm_total_supply=alm_supply[0] / 10 ** 18 if alm_supply else None
+    )
+
+def rpc_endpoint(chain: AsyncChain) -> str:
+    """RPC endpoint a chain talks to, its chain id when unknown"""
+    return getattr(getattr(chain, "settings", None), "rpc_uri", None) or str(chain.chain_id)
+
+def encode_balance_of(owner: str) -> bytes:
+    """Calldata of an ERC-20 `balanceOf(owner)` call"""
+    return BALANCE_OF_SELECTOR + int(owner, 16).to_bytes(32, "big")
+
+def decode_uint256(data: bytes) -> Optional[int]:
+    """Decode a uint256 return value, None if there is none"""
+    if len(data) < 32:
+        return None
+    return int.from_bytes(data[:32], "big")
+
+class BalanceCalls:
+    """Prepared `balanceOf` calls of one chain, reused across wallet refreshes
+
+    Checksum addresses are computed once per token and calldata once per owner,
+    so after the first refresh reading balances needs no hashing or ABI encoding.
+    """
+
+    def __init__(self):
+        # Whether Multicall3 is deployed on the chain, None until checked
+        self.multicall_deployed: Optional[bool] = None
+        self._checksums: Dict[str, str] = {}
+        self._calldata: Dict[str, bytes] = {}
+        self._multicall = None
+        self._multicall_web3 = None
 
-async def process_token_batch(self, token_batch, address, price_lookup=None):
-    """Process a batch of tokens using concurrent async calls"""
+    def checksum(self, web3, address: str) -> str:
+        if address not in self._checksums:
+            self._checksums[address] = web3.to_checksum_address(address)
+        return self._checksums[address]
+
+    def calldata(self, owner: str) -> bytes:
+        if owner not in self._calldata:
+            self._calldata[owner] = encode_balance_of(owner)
+        return self._calldata[owner]
+
+    def multicall(self, web3):
+        """Multicall3 contract, built once per web3 connection"""
+        if self._multicall_web3 is not web3:
+            self._multicall = web3.eth.contract(address=MULTICALL3_ADDRESS, abi=MULTICALL3_ABI)
+            self._multicall_web3 = web3
+        return self._multicall
+
+    def aggregate3_calls(self, web3, token_batch, owner: str) -> list:
+        """`aggregate3` calls reading an owner's balance of each token, each allowed to fail"""
+        calldata = self.calldata(owner)
+        return [(self.checksum(web3, token.token_address), True, calldata) for token in token_batch]
+
+    def transaction(self, web3, token, owner: str) -> dict:
+        """`eth_call` transaction reading an owner's balance of a token"""
+        return {"to": self.checksum(web3, token.token_address), "data": self.calldata(owner)}
+
+async def has_multicall(self: AsyncChain, calls: BalanceCalls) -> bool:
+    """Check once per chain whether Multicall3 is deployed at its canonical address"""
+    if calls.multicall_deployed is None:
+        code = await self.web3.eth.get_code(MULTICALL3_ADDRESS)
+        calls.multicall_deployed = len(code) > 0
+    return calls.multicall_deployed
+
+async def multicall_balances(self: AsyncChain, token_batch, address, calls: BalanceCalls) -> List[Optional[int]]:
+    """Raw balances of a batch of tokens fetched with a single Multicall3 `aggregate3` call
+    
+    Each balance may fail on its own, failed ones are None.
+    """
+    multicall = calls.multicall(self.web3)
+    results = await multicall.functions.aggregate3(calls.aggregate3_calls(self.web3, token_batch, address)).call()
+    return [decode_uint256(return_data) if success else None for success, return_data in results]
+
+async def single_call_balances(self: AsyncChain, token_batch, address, calls: BalanceCalls) -> List[Optional[int]]:
+    """Raw balances of a batch of tokens using concurrent async calls, failed ones are None"""
     async def get_single_token_balance(token):
         """Get balance for a single token"""
         try:
-            contract = self.web3.eth.contract(
-                address=self.web3.to_checksum_address(token.token_address),
-                abi=ERC20_ABI
-            )
-            
-            balance_wei = await contract.functions.balanceOf(address).call()
-            balance = balance_wei / (10 ** token.decimals)
-            
-            # Get stable price if available
-            price_stable = price_lookup.get(token.token_address, 0.0) if price_lookup else 0.0
-            
-            return TokenBalance(
-                token=token,
-                balance=balance,
-                price_stable=price_stable
-            )
-        except Exception:
+            return decode_uint256(bytes(await self.web3.eth.call(calls.transaction(self.web3, token, address))))
+        except Exception as e:
+            # Let the caller back off when throttled, a token that can't be read is just skipped
+            if is_rate_limited(e):
+                raise
             return None
     
     # Use asyncio.gather to make concurrent calls
-    tasks = [get_single_token_balance(token) for token in token_batch]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    return await asyncio.gather(*[get_single_token_balance(token) for token in token_batch])
+
+async def process_token_batch(self, token_batch, address, price_lookup=None, calls=None):
+    """Process a batch of tokens with a single Multicall3 call
     
-    # Filter out None results and exceptions
+    Falls back to one call per token on chains without Multicall3. A failing
+    multicall raises, so the caller can back off and retry the batch. `calls`
+    are the chain's prepared balance calls, prepared for this batch only if None.
+    """
+    calls = calls or BalanceCalls()
+    if await self.has_multicall(calls):
+        balances_wei = await self.multicall_balances(token_batch, address, calls)
+    else:
+        balances_wei = await self.single_call_balances(token_batch, address, calls)
+    
+    # Skip tokens whose balance could not be read
     valid_results = []
-    for result in results:
-        if result is not None and not isinstance(result, Exception):
-            valid_results.append(result)
+    for token, balance_wei in zip(token_batch, balances_wei):
+        if balance_wei is None:
+            continue
+        
+        # Get stable price if available
+        price_stable = price_lookup.get(token.token_address, 0.0) if price_lookup else 0.0
+        
+        valid_results.append(TokenBalance(
+            token=token,
+            balance=balance_wei / (10 ** token.decimals),
+            price_stable=price_stable
+        ))
     
     return valid_results
 
+async def get_eth_balance(self: AsyncChain, address, price_lookup=None) -> TokenBalance:
+    """Get the native ETH balance of an address"""
+    eth_balance = self.web3.from_wei(await self.web3.eth.get_balance(address), 'ether')
+    eth_price = price_lookup.get('ETH', 0.0) if price_lookup else 0.0
+    
+    # Create a Token object for ETH
+    eth_token = Token(
+        chain_id=self.chain_id,
+        chain_name=self.name,
+        token_address='ETH',
+        symbol='ETH',
+        decimals=18,
+        listed=True,
+        wrapped_token_address=None
+    )
+    
+    return TokenBalance(
+        token=eth_token,
+        balance=float(eth_balance),
+        price_stable=eth_price
+    )
+
+async def get_transfer_tokens(self: AsyncChain, address, from_block: int, to_block: int) -> Set[str]:
+    """Addresses of the tokens transferred to or from an address in a block range, lowercased"""
+    address_topic = "0x" + int(address, 16).to_bytes(32, "big").hex()
+    filters = [
+        {"fromBlock": from_block, "toBlock": to_block, "topics": [TRANSFER_TOPIC, address_topic]},
+        {"fromBlock": from_block, "toBlock": to_block, "topics": [TRANSFER_TOPIC, None, address_topic]},
+    ]
+    logs = await asyncio.gather(*[self.web3.eth.get_logs(log_filter) for log_filter in filters])
+    return {log["address"].lower() for chunk in logs for log in chunk}
+
 # Monkey patch AsyncChain to add get_token_balances method
-async def get_token_balances(self: AsyncChain, address=None):
+async def get_token_balances(
+    self: AsyncChain,
+    address=None,
+    get_tokens=None,
+    get_prices=None,
+    on_batch=None,
+    on_failure=None,
+    limit=None,
+    calls=None,
+):
     """Get all token balances for a given address using batched requests
     
-    This method uses asyncio.gather to make concurrent RPC calls in batches,
-    which is significantly faster than sequential calls.
-    
-    Performance: ~16x faster than sequential method
+    Each batch of tokens is read with a single Multicall3 call, or with
+    concurrent calls on chains without Multicall3. Batches are pipelined,
+    keeping as many in flight as the chain's RPC endpoint keeps up with.
     
     Args:
         address: The address to check balances for. If None, uses self.account.address
+        get_tokens: Coroutine function listing the chain's tokens. If None, uses self.get_all_tokens
+        get_prices: Coroutine function pricing a list of tokens. If None, uses self.get_prices
+        on_batch: Called with the non-zero balances of every batch as soon as it resolves
+        on_failure: Called with the tokens and the last error of every batch that kept failing
+        limit: Adaptive limit of the chain's RPC endpoint. If None, one used for this call only
+        calls: Prepared balance calls of the chain. If None, prepared for this call only
     
     Returns:
-        List of TokenBalance objects with token info and stable currency values
+        List of TokenBalance objects with token info and stable currency values,
+        without the balances of failed batches
     """
     if address is None:
         address = self.account.address
     
-    balances, tokens = [], await self.get_all_tokens()
-    prices = await self.get_prices(tokens)
+    balances, tokens = [], await (get_tokens or self.get_all_tokens)()
+    prices = await (get_prices or self.get_prices)(tokens)
     seen_addresses, erc20_tokens = set(), []
     
     # Build price lookup dictionary
@@ -97,48 +333,47 @@ async def get_token_balances(self: AsyncChain, address=None):
     for price in prices:
         price_lookup[price.token.token_address] = price.price
     
-
     # Get ETH balance
-    eth_balance = self.web3.from_wei(await self.web3.eth.get_balance(address), 'ether')
-    eth_price = price_lookup.get('ETH', 0.0)
-    
-    # Create a Token object for ETH
-    eth_token = Token(
-        chain_id=self.chain_id,
-        chain_name=self.name,
-        token_address='ETH',
-        symbol='ETH',
-        decimals=18,
-        listed=True,
-        wrapped_token_address=None
-    )
-    
-    balances.append(TokenBalance(
-        token=eth_token,
-        balance=float(eth_balance),
-        price_stable=eth_price
-    ))
+    balances.append(await self.get_eth_balance(address, price_lookup))
+    if on_batch:
+        on_batch(balances[:])
 
     for token in tokens:
         if token.token_address != 'ETH' and token.listed and token.token_address not in seen_addresses:
             erc20_tokens.append(token)
             seen_addresses.add(token.token_address)
 
-    # Process tokens in batches
-    batch_size = 50  # Adjust based on RPC limits
+    # Process tokens in batches, as many at once as the chain's endpoint keeps up with
+    limits = chain_limits(self.chain_id)
+    limit = limit or AdaptiveLimit.for_chain(limits)
+    calls = calls or BalanceCalls()
+    batches = [erc20_tokens[i:i + limits.batch_size] for i in range(0, len(erc20_tokens), limits.batch_size)]
+    async def process_batch(batch):
+        # Keep non-zero balances only
+        results = [
+            result for result in await self.process_token_batch(batch, address, price_lookup, calls)
+            if result.balance > 0
+        ]
+        if on_batch:
+            on_batch(results)
+        return results
     
-    for i in range(0, len(erc20_tokens), batch_size):
-        batch = erc20_tokens[i:i + batch_size]
-        # Process batch using batch_requests
-        batch_results = await self.process_token_batch(batch, address, price_lookup)
-        
-        # Add non-zero balances to results
-        for result in batch_results:
-            if result and result.balance > 0:
-                balances.append(result)
+    for batch, results in zip(batches, await run_pipelined(batches, process_batch, limit)):
+        if isinstance(results, Exception):
+            # Leave out batches that kept failing, the caller decides what a partial result is worth
+            if on_failure:
+                on_failure(batch, results)
+        else:
+            balances.extend(results)
     
     return balances
 
 # Add the methods to AsyncChain
+AsyncChain.has_multicall = has_multicall
+AsyncChain.multicall_balances = multicall_balances
+AsyncChain.single_call_balances = single_call_balances
 AsyncChain.process_token_batch = process_token_batch
 AsyncChain.get_token_balances = get_token_balances
+AsyncChain.get_eth_balance = get_eth_balance
+AsyncChain.get_transfer_tokens = get_transfer_tokens
+AsyncChain.get_cl_pool_state = get_cl_pool_state
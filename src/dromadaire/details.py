@@ -0,0 +1,95 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+from dromadaire.confiture import ClPoolState, LiquidityPool, LiquidityPoolEpoch
+
+
+@dataclass(eq=False)
+class PoolDetails:
+    """On-chain details of a pool, compared by identity so rendered text can be keyed on them"""
+    # Latest epoch of the pool's gauge: votes, emissions, fees and incentives
+    epoch: Optional[LiquidityPoolEpoch] = None
+    # Price, tick and liquidity of concentrated liquidity pools, None for other pools
+    cl_state: Optional[ClPoolState] = None
+
+
+PoolDetailsFetcher = Callable[[LiquidityPool], Awaitable[Optional[PoolDetails]]]
+
+
+class PoolDetailsLoader:
+    """On-chain pool details, fetched on demand and kept for `ttl` seconds
+
+    At most `max_entries` pools are kept, least recently used ones are dropped
+    first. Concurrent loads of the same pool share one fetch, and prefetches run
+    at most `max_prefetches` at a time so they never crowd out the highlighted pool.
+    """
+
+    ttl: float = 60.0
+    max_entries: int = 256
+    max_prefetches: int = 2
+
+    def __init__(self, fetch: PoolDetailsFetcher):
+        self.fetch = fetch
+        # LP address to (fetched at, details), least recently used first
+        self._entries: OrderedDict[str, Tuple[float, Optional[PoolDetails]]] = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._prefetch_slots: Optional[asyncio.Semaphore] = None
+
+    def has(self, pool: LiquidityPool) -> bool:
+        """Whether fresh details of a pool are cached"""
+        entry = self._entries.get(pool.lp)
+        if entry is None:
+            return False
+        if time.monotonic() - entry[0] > self.ttl:
+            del self._entries[pool.lp]
+            return False
+        return True
+
+    def get(self, pool: LiquidityPool) -> Optional[PoolDetails]:
+        """Cached details of a pool, None when not cached or the pool has none"""
+        if not self.has(pool):
+            return None
+        self._entries.move_to_end(pool.lp)
+        return self._entries[pool.lp][1]
+
+    async def load(self, pool: LiquidityPool) -> Optional[PoolDetails]:
+        """Details of a pool, fetched unless cached"""
+        if self.has(pool):
+            return self.get(pool)
+        task = self._inflight.get(pool.lp)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(pool))
+            self._inflight[pool.lp] = task
+            task.add_done_callback(lambda task: self._forget(pool.lp, task))
+        # Whoever gave up waiting, the fetch completes and fills the cache for the next caller
+        return await asyncio.shield(task)
+
+    def _forget(self, lp: str, task: asyncio.Task) -> None:
+        self._inflight.pop(lp, None)
+        # Nobody may be waiting any more, don't let a failure go unretrieved
+        if not task.cancelled():
+            task.exception()
+
+    async def _fetch(self, pool: LiquidityPool) -> Optional[PoolDetails]:
+        details = await self.fetch(pool)
+        self._entries[pool.lp] = (time.monotonic(), details)
+        self._entries.move_to_end(pool.lp)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return details
+
+    async def prefetch(self, pools: Iterable[LiquidityPool]) -> None:
+        """Load details of pools the user is likely to look at next, ignoring failures"""
+        if self._prefetch_slots is None:
+            self._prefetch_slots = asyncio.Semaphore(self.max_prefetches)
+
+        async def prefetch_pool(pool: LiquidityPool) -> None:
+            async with self._prefetch_slots:
+                try:
+                    await self.load(pool)
+                except Exception:
+                    pass
+
+        await asyncio.gather(*[prefetch_pool(pool) for pool in pools if not self.has(pool)])
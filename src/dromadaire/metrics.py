@@ -0,0 +1,202 @@
+import itertools
+import threading
+from array import array
+from dataclasses import dataclass
+from operator import add, mul
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from dromadaire.confiture import Amount, LiquidityPool, Token
+
+SECONDS_PER_WEEK = 7 * 24 * 60 * 60
+WEEKS_PER_YEAR = 52
+
+# Prices are keyed by chain id and lowercased token address
+PriceKey = Tuple[str, str]
+
+
+def price_key(token: Optional[Token]) -> Optional[PriceKey]:
+    if token is None:
+        return None
+    return (str(token.chain_id), token.token_address.lower())
+
+
+def token_units(amount: Optional[Amount], token: Optional[Token] = None) -> float:
+    """Amount in whole tokens, from an amount in the token's smallest unit"""
+    if amount is None:
+        return 0.0
+    token = getattr(amount, 'token', None) or token
+    try:
+        return float(amount.amount) / 10 ** (token.decimals if token else 18)
+    except (TypeError, ValueError, AttributeError):
+        return 0.0
+
+
+def annualize(weekly_usd: float, base_usd: float) -> float:
+    """APR in percent of a weekly USD return on a USD base"""
+    if base_usd <= 0:
+        return 0.0
+    return weekly_usd * WEEKS_PER_YEAR / base_usd * 100
+
+
+def pool_weekly_emissions(pool: LiquidityPool) -> float:
+    """Emissions a pool's gauge pays out per week, in whole emission tokens"""
+    weekly = token_units(pool.weekly_emissions, pool.emissions_token)
+    return weekly or token_units(pool.emissions, pool.emissions_token) * SECONDS_PER_WEEK
+
+
+def pool_staked_share(pool: LiquidityPool) -> float:
+    """Share of a pool's liquidity staked in its gauge, where emissions go
+
+    Falls back to the whole pool when the supplies are not known.
+    """
+    staked, total = pool.gauge_total_supply or 0, pool.total_supply or 0
+    if staked <= 0 or total <= 0:
+        return 1.0
+    return min(staked / total, 1.0)
+
+
+class PoolMetric(NamedTuple):
+    tvl: float
+    fee_apr: float
+    emissions_apr: float
+
+    @property
+    def apr(self) -> float:
+        return self.fee_apr + self.emissions_apr
+
+
+@dataclass(frozen=True)
+class PoolMetrics:
+    """USD TVL and APRs of a list of pools, one array entry per pool"""
+    pools: List[LiquidityPool]
+    positions: Dict[str, int]
+    tvl: array
+    fee_apr: array
+    emissions_apr: array
+    apr: array
+    # Changes only when the prices the metrics were computed from change
+    price_version: int
+
+    def get(self, pool: LiquidityPool) -> PoolMetric:
+        position = self.positions.get(pool.lp)
+        if position is None:
+            return PoolMetric(0.0, 0.0, 0.0)
+        return PoolMetric(self.tvl[position], self.fee_apr[position], self.emissions_apr[position])
+
+
+class PoolColumns:
+    """Token amounts of a list of pools laid out as arrays
+
+    Every token gets an index into a price vector, index 0 standing for a
+    missing token priced at 0, so pricing all pools is a gather and a few
+    element-wise passes.
+    """
+
+    def __init__(self, pools: List[LiquidityPool]):
+        self.pools = pools
+        self.positions = {pool.lp: position for position, pool in enumerate(pools)}
+        self.tokens: List[Optional[PriceKey]] = [None]
+        # Prices that came with the pools, used for tokens without a better price
+        self.embedded_prices: Dict[PriceKey, float] = {}
+        token_indexes: Dict[Optional[PriceKey], int] = {None: 0}
+
+        def index(token: Optional[Token], amount: Optional[Amount] = None) -> int:
+            key = price_key(token)
+            if key not in token_indexes:
+                token_indexes[key] = len(self.tokens)
+                self.tokens.append(key)
+            price = getattr(getattr(amount, 'price', None), 'price', None)
+            if key is not None and price:
+                self.embedded_prices.setdefault(key, float(price))
+            return token_indexes[key]
+
+        self.token0 = array("l", (index(pool.token0, pool.reserve0) for pool in pools))
+        self.token1 = array("l", (index(pool.token1, pool.reserve1) for pool in pools))
+        self.emissions_token = array("l", (index(pool.emissions_token, pool.emissions) for pool in pools))
+        self.reserve0 = array("d", (token_units(pool.reserve0, pool.token0) for pool in pools))
+        self.reserve1 = array("d", (token_units(pool.reserve1, pool.token1) for pool in pools))
+        self.fees0 = array("d", (token_units(pool.token0_fees, pool.token0) for pool in pools))
+        self.fees1 = array("d", (token_units(pool.token1_fees, pool.token1) for pool in pools))
+        self.weekly_emissions = array("d", (pool_weekly_emissions(pool) for pool in pools))
+        self.staked_share = array("d", (pool_staked_share(pool) for pool in pools))
+
+    def price_vector(self, prices: Dict[PriceKey, float]) -> array:
+        return array("d", (
+            prices.get(key, self.embedded_prices.get(key, 0.0)) if key else 0.0 for key in self.tokens
+        ))
+
+
+def gather(values: array, indexes: array) -> array:
+    return array("d", map(values.__getitem__, indexes))
+
+
+class MetricsEngine:
+    """Computes USD TVL, fee APR and emissions APR of all loaded pools in one pass
+
+    Fees accrued in the current epoch and weekly emissions are annualized over
+    52 weeks; emissions only go to the staked share of a pool. Token amounts
+    are laid out once per pool list and prices once per price map, so metrics
+    are recomputed only when reserves or prices change. Pool lists and price
+    maps are never mutated, new prices come as a new map.
+    """
+
+    def __init__(self):
+        self._columns: Optional[PoolColumns] = None
+        self._price_vector: Optional[array] = None
+        self._metrics: Optional[PoolMetrics] = None
+        self._prices_map: Optional[Dict[PriceKey, float]] = None
+        # Last price of every token seen, to tell repriced tokens from newly loaded ones
+        self._prices: Dict[PriceKey, float] = {}
+        self._price_versions = itertools.count(1)
+        self._price_version = 0
+        # Metrics are read by the UI and by search worker threads
+        self._lock = threading.Lock()
+
+    def compute(self, pools: List[LiquidityPool], prices: Optional[Dict[PriceKey, float]] = None) -> PoolMetrics:
+        """Metrics of `pools`, priced with `prices` and then the prices that came with the pools"""
+        with self._lock:
+            return self._compute(pools, prices if prices is not None else {})
+
+    def _compute(self, pools: List[LiquidityPool], prices: Dict[PriceKey, float]) -> PoolMetrics:
+        if self._metrics is not None and self._metrics.pools is pools and self._prices_map is prices:
+            return self._metrics
+        self._prices_map = prices
+        if self._columns is None or self._columns.pools is not pools:
+            self._columns = PoolColumns(pools)
+            self._metrics = None
+        columns = self._columns
+        price_vector = columns.price_vector(prices)
+        if price_vector != self._price_vector:
+            self._price_vector = price_vector
+            self._metrics = None
+            if self.update_prices(columns.tokens, price_vector):
+                self._price_version = next(self._price_versions)
+        if self._metrics is None:
+            self._metrics = self.price(columns, price_vector)
+        return self._metrics
+
+    def update_prices(self, tokens: List[Optional[PriceKey]], price_vector: array) -> bool:
+        """Remember token prices, telling whether any known token was repriced"""
+        repriced = False
+        for key, price in zip(tokens, price_vector):
+            if key is not None:
+                repriced = repriced or self._prices.get(key, price) != price
+                self._prices[key] = price
+        return repriced
+
+    def price(self, columns: PoolColumns, price_vector: array) -> PoolMetrics:
+        price0 = gather(price_vector, columns.token0)
+        price1 = gather(price_vector, columns.token1)
+        tvl = array("d", map(add, map(mul, columns.reserve0, price0), map(mul, columns.reserve1, price1)))
+        fees = map(add, map(mul, columns.fees0, price0), map(mul, columns.fees1, price1))
+        fee_apr = array("d", map(annualize, fees, tvl))
+        emissions = map(mul, columns.weekly_emissions, gather(price_vector, columns.emissions_token))
+        emissions_apr = array("d", map(annualize, emissions, map(mul, tvl, columns.staked_share)))
+        return PoolMetrics(
+            pools=columns.pools,
+            positions=columns.positions,
+            tvl=tvl,
+            fee_apr=fee_apr,
+            emissions_apr=emissions_apr,
+            apr=array("d", map(add, fee_apr, emissions_apr)),
+            price_version=self._price_version,
+        )
@@ -0,0 +1,114 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Sequence, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass(frozen=True)
+class ChainLimits:
+    """How hard to push a chain's RPC endpoint"""
+    # Tokens per balance batch, i.e. per multicall
+    batch_size: int = 50
+    # Batches in flight when the endpoint first gets used
+    initial_in_flight: int = 2
+    # Most batches ever in flight, however fast the endpoint answers
+    max_in_flight: int = 8
+    # Responses slower than this many seconds count as congestion
+    target_latency: float = 2.0
+
+
+# Limits of chains whose public endpoints take more (or less) than the defaults
+CHAIN_LIMITS: Dict[str, ChainLimits] = {
+    "10": ChainLimits(batch_size=200, max_in_flight=8),
+    "8453": ChainLimits(batch_size=200, max_in_flight=8),
+    "130": ChainLimits(batch_size=100, max_in_flight=4),
+    "1135": ChainLimits(batch_size=50, initial_in_flight=1, max_in_flight=2),
+}
+
+
+def chain_limits(chain_id: str) -> ChainLimits:
+    return CHAIN_LIMITS.get(str(chain_id), ChainLimits())
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """Whether an RPC error says we are sending too many requests"""
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "too many requests" in message
+
+
+class AdaptiveLimit:
+    """Concurrency limit that adapts to an endpoint with AIMD
+
+    Every request answered within the target latency raises the limit by
+    roughly one per limit's worth of requests (additive increase). Errors,
+    rate limiting and slow answers halve it (multiplicative decrease).
+    """
+
+    def __init__(self, initial: int = 2, maximum: int = 8, target_latency: float = 2.0):
+        self.limit = float(initial)
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.in_flight = 0
+        self._changed = asyncio.Condition()
+
+    @classmethod
+    def for_chain(cls, limits: ChainLimits) -> "AdaptiveLimit":
+        """Limit starting from a chain's `ChainLimits`"""
+        return cls(initial=limits.initial_in_flight, maximum=limits.max_in_flight, target_latency=limits.target_latency)
+
+    def increase(self) -> None:
+        self.limit = min(self.limit + 1 / self.limit, float(self.maximum))
+
+    def decrease(self) -> None:
+        self.limit = max(self.limit / 2, 1.0)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one of the limited slots for a request, adapting the limit to how it went"""
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        started_at = time.monotonic()
+        try:
+            yield
+        except Exception:
+            self.decrease()
+            raise
+        else:
+            if time.monotonic() - started_at > self.target_latency:
+                self.decrease()
+            else:
+                self.increase()
+        finally:
+            async with self._changed:
+                self.in_flight -= 1
+                self._changed.notify_all()
+
+
+async def run_pipelined(
+    items: Sequence[T],
+    worker: Callable[[T], Awaitable[R]],
+    limit: AdaptiveLimit,
+    retries: int = 2,
+) -> List[R]:
+    """Run `worker` over `items` keeping as many calls in flight as `limit` allows
+
+    Failed calls are retried up to `retries` times. Results come back in the
+    order of `items`, with the exception in place of calls that kept failing.
+    """
+    async def run(item: T) -> R:
+        for attempt in range(retries + 1):
+            try:
+                async with limit.slot():
+                    return await worker(item)
+            except Exception as e:
+                if attempt == retries:
+                    raise
+                # Give a rate limited endpoint a moment before trying again
+                await asyncio.sleep(0.5 * (attempt + 1) if is_rate_limited(e) else 0)
+
+    return await asyncio.gather(*[run(item) for item in items], return_exceptions=True)
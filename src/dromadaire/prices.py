@@ -0,0 +1,90 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from dromadaire.confiture import LiquidityPool, Price, Token
+from dromadaire.metrics import PriceKey, price_key
+
+PriceFetcher = Callable[[str, List[Token]], Awaitable[List[Price]]]
+
+
+def pool_prices(pools: Iterable[LiquidityPool]) -> List[Price]:
+    """Prices that came with pools, one per token"""
+    prices: Dict[PriceKey, Price] = {}
+    for pool in pools:
+        for amount in (pool.reserve0, pool.reserve1, pool.emissions):
+            price = getattr(amount, 'price', None)
+            if price is not None and price.token is not None and price.price:
+                prices.setdefault(price_key(price.token), price)
+    return list(prices.values())
+
+
+class PriceService:
+    """USD token prices keyed by (chain id, token address), fetched at most once per `ttl` seconds
+
+    Concurrent requests for the same tokens share one fetch, and a request only
+    fetches the tokens whose prices are missing or expired, in a single batch.
+    `prices` maps every known key to its price and is replaced, never mutated,
+    whenever a price changes.
+    """
+
+    ttl: float = 300.0
+
+    def __init__(self, fetch: PriceFetcher):
+        self.fetch = fetch
+        self.prices: Dict[PriceKey, float] = {}
+        # Key to (fetched at, price), the price is None for tokens that have none
+        self._entries: Dict[PriceKey, Tuple[float, Optional[float]]] = {}
+        self._inflight: Dict[PriceKey, asyncio.Task] = {}
+
+    def is_fresh(self, key: PriceKey) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and time.monotonic() - entry[0] <= self.ttl
+
+    def store(self, prices: Dict[PriceKey, Optional[float]]) -> None:
+        """Record freshly fetched prices"""
+        now = time.monotonic()
+        for key, price in prices.items():
+            self._entries[key] = (now, price)
+        changed = {key: price for key, price in prices.items() if price and self.prices.get(key) != price}
+        if changed:
+            self.prices = {**self.prices, **changed}
+
+    def seed(self, prices: Iterable[Price]) -> None:
+        """Record prices fetched elsewhere, like the ones that come with pools"""
+        self.store({price_key(price.token): float(price.price) for price in prices})
+
+    async def get_prices(self, chain_id: str, tokens: List[Token]) -> List[Price]:
+        """Prices of a chain's tokens, refilling only the missing and expired ones
+
+        If a refill fails, the last known prices are returned, tokens without
+        one are left out.
+        """
+        keys = {price_key(token): token for token in tokens}
+        expired = [token for key, token in keys.items() if not self.is_fresh(key) and key not in self._inflight]
+        if expired:
+            task = asyncio.ensure_future(self._refill(chain_id, expired))
+            for token in expired:
+                self._inflight[price_key(token)] = task
+            task.add_done_callback(lambda _: self._forget(expired, task))
+
+        waiting = {self._inflight[key] for key in keys if key in self._inflight}
+        # One caller giving up never cancels a refill others are waiting on
+        await asyncio.gather(*[asyncio.shield(task) for task in waiting], return_exceptions=True)
+
+        prices = []
+        for key, token in keys.items():
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None:
+                prices.append(Price(token=token, price=entry[1]))
+        return prices
+
+    def _forget(self, tokens: List[Token], task: asyncio.Task) -> None:
+        for token in tokens:
+            if self._inflight.get(price_key(token)) is task:
+                del self._inflight[price_key(token)]
+        if not task.cancelled():
+            task.exception()
+
+    async def _refill(self, chain_id: str, tokens: List[Token]) -> None:
+        fetched = {price_key(price.token): float(price.price) for price in await self.fetch(chain_id, tokens)}
+        self.store({price_key(token): fetched.get(price_key(token)) for token in tokens})
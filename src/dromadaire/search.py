@@ -0,0 +1,400 @@
+import heapq
+import re
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+from dromadaire.confiture import LiquidityPool
+from dromadaire.metrics import MetricsEngine, PoolMetrics
+
+ADDRESS_PATTERN = re.compile(r"^0x[0-9a-f]{40}$")
+# Numeric comparisons such as `tvl>1m` or `apr>=5`
+COMPARISON_PATTERN = re.compile(r"^(?P<column>[a-z]+)(?P<op>>=|<=|>|<|=)(?P<value>.+)$")
+# Columns of `pool_columns` that queries can compare and sort on
+NUMERIC_COLUMNS = ("tvl", "apr", "fee")
+# Columns pools can be sorted on: the numeric ones and the pool label
+SORT_COLUMNS = ("pool",) + NUMERIC_COLUMNS
+NUMBER_SUFFIXES = {"k": 1e3, "m": 1e6, "b": 1e9}
+# Bare words that filter on the pool type
+POOL_TYPES = ("stable", "volatile", "cl")
+# Characters after which a new word starts in a pool's search text
+WORD_BOUNDARIES = frozenset("\n /-_.()[]")
+
+
+def pool_search_text(pool: LiquidityPool) -> str:
+    """Lowercased text a pool can be found by: token symbols and names, chain and pool name
+
+    Fields are on their own lines, with a newline at both ends so every field
+    is delimited on both sides.
+    """
+    fields = [
+        getattr(pool.token0, 'symbol', ''),
+        getattr(pool.token1, 'symbol', ''),
+        getattr(pool.token0, 'name', ''),
+        getattr(pool.token1, 'name', ''),
+        getattr(pool, 'chain_name', ''),
+        getattr(pool, 'symbol', ''),
+        getattr(pool, 'name', ''),
+    ]
+    return "\n" + "\n".join(field for field in fields if field).lower() + "\n"
+
+
+def pool_columns(pools: List[LiquidityPool], metrics: Optional[PoolMetrics] = None) -> Dict[str, array]:
+    """Numeric columns of a list of pools that queries can compare and sort on
+
+    TVL and APR come from `metrics`, computed from the prices that came with the pools when not given.
+    """
+    if metrics is None:
+        metrics = MetricsEngine().compute(pools)
+    return {
+        "tvl": metrics.tvl,
+        "apr": metrics.apr,
+        "fee": array("d", (float(pool.pool_fee or 0) for pool in pools)),
+    }
+
+
+def parse_number(text: str) -> float:
+    """Parse numbers like `5`, `2.5%`, `$1m` or `10k`"""
+    text = text.strip("$%")
+    multiplier = NUMBER_SUFFIXES.get(text[-1:], 1)
+    if multiplier != 1:
+        text = text[:-1]
+    return float(text) * multiplier
+
+
+@dataclass(frozen=True)
+class PoolQuery:
+    """A parsed pool search such as `chain:base stable tvl>1m apr>=5 token:usdc sort:-tvl`
+
+    A pool has to be on one of the `chains` (matched by name prefix or chain id),
+    hold every one of the `tokens` (by symbol or address), be of every one of
+    the `pool_types` and pass every comparison. Words that are not filters are
+    fuzzy search terms.
+    """
+    terms: Tuple[str, ...] = ()
+    chains: Tuple[str, ...] = ()
+    tokens: Tuple[str, ...] = ()
+    pool_types: Tuple[str, ...] = ()
+    comparisons: Tuple[Tuple[str, str, float], ...] = ()
+    sort: Optional[Tuple[str, bool]] = field(default=None)
+
+
+@lru_cache(maxsize=256)
+def parse_query(query: str) -> PoolQuery:
+    """Parse a lowercased pool search query
+
+    Anything that does not parse as a filter is kept as a search term, so a
+    half-typed filter still searches instead of failing.
+    """
+    terms, chains, tokens, pool_types, comparisons, sort = [], [], [], [], [], None
+    for word in query.split():
+        key, _, value = word.partition(":")
+        comparison = COMPARISON_PATTERN.match(word)
+        if key == "chain" and value:
+            chains.append(value)
+        elif key == "token" and value:
+            tokens.append(value)
+        elif key == "sort" and value.lstrip("-") in SORT_COLUMNS:
+            sort = (value.lstrip("-"), value.startswith("-"))
+        elif word in POOL_TYPES:
+            pool_types.append(word)
+        elif comparison and comparison["column"] in NUMERIC_COLUMNS:
+            try:
+                comparisons.append((comparison["column"], comparison["op"], parse_number(comparison["value"])))
+            except ValueError:
+                terms.append(word)
+        else:
+            terms.append(word)
+    return PoolQuery(tuple(terms), tuple(chains), tuple(tokens), tuple(pool_types), tuple(comparisons), sort)
+
+
+def char_mask(text: str) -> int:
+    """Bitmask of the characters in a text, each folded onto one of 64 bits
+
+    Text can only contain a term's characters if its mask has all of the
+    term's bits, which rules out most texts before any regex runs.
+    """
+    mask = 0
+    for char in set(text):
+        mask |= 1 << (ord(char) & 63)
+    return mask
+
+
+@lru_cache(maxsize=256)
+def subsequence_pattern(term: str) -> re.Pattern:
+    """Regex finding the characters of a term in order, each one in its own group"""
+    return re.compile(".*?".join(f"({re.escape(char)})" for char in term), re.DOTALL)
+
+
+def score_term(term: str, text: str) -> Optional[float]:
+    """How well a search term matches a pool's search text, None if it doesn't
+
+    Like fzf, the characters of the term only have to appear in order. Whole
+    substrings score above any scattered match, a whole field above that, and
+    scattered matches earn points for starting words, running consecutively
+    and spanning less text.
+    """
+    position = text.find(term)
+    if position >= 0:
+        score = 100.0 + 10 * len(term)
+        if text[position - 1] in WORD_BOUNDARIES:
+            score += 50
+            if text[position + len(term)] == "\n" and text[position - 1] == "\n":
+                score += 100
+        return score
+
+    match = subsequence_pattern(term).search(text)
+    if match is None:
+        return None
+    score, previous = 0.0, None
+    for group in range(1, len(term) + 1):
+        index = match.start(group)
+        score += 2
+        if text[index - 1] in WORD_BOUNDARIES:
+            score += 3
+        if previous is not None and index == previous + 1:
+            score += 2
+        previous = index
+    return score - 0.1 * (match.end() - match.start() - len(term))
+
+
+class PoolSearchIndex:
+    """Search structures for a list of pools, built once when pools load
+
+    Addresses are stored lowercased, which is what comparing checksummed
+    addresses case-insensitively boils down to, so lookups need no hashing.
+    Pools matching recent search terms are kept so that a term extending one
+    of them (e.g. "usd" after "us") only rescans the pools that already matched.
+    """
+
+    # Number of recent search terms whose matches are kept
+    max_cached_queries: int = 32
+
+    def __init__(self, pools: List[LiquidityPool], metrics: Optional[PoolMetrics] = None):
+        self.pools = pools
+        self.metrics = metrics
+        # Recent search terms mapped to the scores of matching pools, least recent first
+        self._results: OrderedDict[str, Dict[int, float]] = OrderedDict()
+        # Searches run in worker threads
+        self._results_lock = threading.Lock()
+        self.texts = [pool_search_text(pool) for pool in pools]
+        # Character bitmasks of the texts, checked before scoring
+        self.masks = [char_mask(text) for text in self.texts]
+        # Positions of the pools an LP or token address belongs to
+        self.by_address: Dict[str, List[int]] = {}
+        for position, pool in enumerate(pools):
+            addresses = {
+                getattr(pool, 'lp', None),
+                getattr(pool.token0, 'token_address', None),
+                getattr(pool.token1, 'token_address', None),
+            }
+            for address in addresses:
+                if address:
+                    self.by_address.setdefault(address.lower(), []).append(position)
+
+        # Positions of pools by lowercased chain name and id, token symbol and pool type
+        self.by_chain: Dict[str, List[int]] = {}
+        self.by_symbol: Dict[str, List[int]] = {}
+        self.by_type: Dict[str, List[int]] = {pool_type: [] for pool_type in POOL_TYPES}
+        for position, pool in enumerate(pools):
+            for chain in {str(pool.chain_id).lower(), pool.chain_name.lower()}:
+                self.by_chain.setdefault(chain, []).append(position)
+            for symbol in {getattr(pool.token0, 'symbol', ''), getattr(pool.token1, 'symbol', '')}:
+                if symbol:
+                    self.by_symbol.setdefault(symbol.lower(), []).append(position)
+            self.by_type["stable" if pool.is_stable else "volatile"].append(position)
+            if pool.is_cl:
+                self.by_type["cl"].append(position)
+
+        self.columns = pool_columns(pools, metrics)
+        # Column name to the positions of all pools in ascending order of that column
+        self._sort_orders: Dict[str, List[int]] = {}
+        # Numeric column name to its values in ascending order
+        self._sorted_values: Dict[str, array] = {}
+
+    def set_metrics(self, metrics: PoolMetrics) -> None:
+        """Swap in metrics computed from newer prices for the same pools
+
+        Only TVL and APR depend on prices, so the text, address and symbol
+        indexes, the cached search results and the other sort orders are kept.
+        """
+        self.metrics = metrics
+        self.columns = {**self.columns, "tvl": metrics.tvl, "apr": metrics.apr}
+        self._sort_orders = {
+            column: order for column, order in self._sort_orders.items() if column not in ("tvl", "apr")
+        }
+        self._sorted_values = {
+            column: values for column, values in self._sorted_values.items() if column not in ("tvl", "apr")
+        }
+
+    def search(
+        self, query: str, limit: Optional[int] = None, sort: Optional[Tuple[str, bool]] = None
+    ) -> List[LiquidityPool]:
+        """Pools matching a query, best matches first
+
+        A full address matches the pool with that LP address and every pool
+        holding that token. Anything else is parsed as a `PoolQuery`: filters
+        narrow pools down through the indexes and sorted columns, and search
+        terms each have to fuzzily match the pool's search text.
+
+        Results follow the query's `sort:` column, else the `sort` given as
+        (column, descending), else the fuzzy score, else the original order.
+        Only the `limit` best scoring pools are kept when ranking by score.
+        """
+        query = (query or "").strip().lower()
+        parsed = parse_query(query)
+        sort = parsed.sort or sort
+
+        scores = None
+        if ADDRESS_PATTERN.match(query):
+            selected = set(self.by_address.get(query, []))
+        else:
+            selected = self.filter_positions(parsed)
+            if parsed.terms:
+                scores = self.score_terms(parsed.terms)
+                if selected is not None:
+                    scores = {position: score for position, score in scores.items() if position in selected}
+
+        if sort:
+            wanted = scores if scores is not None else selected
+            return [self.pools[position] for position in self.sort_positions(*sort, wanted)]
+        if scores is not None:
+            def rank(position):
+                # Best scores first, earlier pools first among equal scores
+                return scores[position], -position
+
+            if limit is None:
+                ranked = sorted(scores, key=rank, reverse=True)
+            else:
+                ranked = heapq.nlargest(limit, scores, key=rank)
+            return [self.pools[position] for position in ranked]
+        if selected is None:
+            return self.pools
+        return [self.pools[position] for position in sorted(selected)]
+
+    def score_terms(self, terms: Tuple[str, ...]) -> Dict[int, float]:
+        """Total scores of the pools matching every search term, by position"""
+        scores = self.search_term(terms[0])
+        for term in terms[1:]:
+            term_scores = self.search_term(term)
+            scores = {
+                position: score + term_scores[position]
+                for position, score in scores.items()
+                if position in term_scores
+            }
+        return scores
+
+    def filter_positions(self, parsed: PoolQuery) -> Optional[Set[int]]:
+        """Positions of pools passing the filters of a query, None if it has none"""
+        selections = []
+        if parsed.chains:
+            selections.append([
+                position
+                for chain, positions in self.by_chain.items()
+                if chain.startswith(parsed.chains)
+                for position in positions
+            ])
+        for token in parsed.tokens:
+            if ADDRESS_PATTERN.match(token):
+                selections.append(self.by_address.get(token, []))
+            else:
+                selections.append(self.by_symbol.get(token, []))
+        for pool_type in parsed.pool_types:
+            selections.append(self.by_type[pool_type])
+        for column, op, value in parsed.comparisons:
+            selections.append(self.column_range(column, op, value))
+
+        if not selections:
+            return None
+        selections.sort(key=len)
+        selected = set(selections[0])
+        for positions in selections[1:]:
+            selected.intersection_update(positions)
+        return selected
+
+    def sort_order(self, column: str) -> List[int]:
+        """Positions of all pools in ascending order of a column, computed once per index"""
+        if column not in self._sort_orders:
+            if column == "pool":
+                labels = [
+                    f"{pool.chain_name} {getattr(pool.token0, 'symbol', '')} / {getattr(pool.token1, 'symbol', '')}".lower()
+                    for pool in self.pools
+                ]
+                self._sort_orders[column] = sorted(range(len(labels)), key=labels.__getitem__)
+            else:
+                values = self.columns[column]
+                self._sort_orders[column] = sorted(range(len(values)), key=values.__getitem__)
+        return self._sort_orders[column]
+
+    def sorted_column(self, column: str) -> Tuple[List[int], array]:
+        """Positions of all pools in ascending order of a numeric column, with the sorted values"""
+        positions = self.sort_order(column)
+        if column not in self._sorted_values:
+            values = self.columns[column]
+            self._sorted_values[column] = array("d", (values[position] for position in positions))
+        return positions, self._sorted_values[column]
+
+    def column_range(self, column: str, op: str, value: float) -> List[int]:
+        """Positions of pools whose column compares to a value, found by bisecting the sorted column"""
+        positions, values = self.sorted_column(column)
+        if op == ">":
+            return positions[bisect_right(values, value):]
+        if op == ">=":
+            return positions[bisect_left(values, value):]
+        if op == "<":
+            return positions[:bisect_left(values, value)]
+        if op == "<=":
+            return positions[:bisect_right(values, value)]
+        return positions[bisect_left(values, value):bisect_right(values, value)]
+
+    def sort_positions(self, column: str, descending: bool, selected=None) -> List[int]:
+        """Positions ordered by a column, limited to `selected` positions if given
+
+        Walking the cached sort order and keeping the selected positions costs a
+        single pass, whatever the sort column and however the pools were selected.
+        """
+        positions = self.sort_order(column)
+        if descending:
+            positions = positions[::-1]
+        if selected is None:
+            return positions
+        return [position for position in positions if position in selected]
+
+    def search_term(self, term: str) -> Dict[int, float]:
+        """Scores of the pools whose search text fuzzily matches a lowercased term, by position
+
+        Only texts holding every character of the term are scored.
+        """
+        with self._results_lock:
+            if term in self._results:
+                self._results.move_to_end(term)
+                return self._results[term]
+            candidates = self.narrowest_cached_match(term)
+
+        mask, masks, texts = char_mask(term), self.masks, self.texts
+        if candidates is None:
+            candidates = range(len(texts))
+        scores = {}
+        for position in [position for position in candidates if masks[position] & mask == mask]:
+            score = score_term(term, texts[position])
+            if score is not None:
+                scores[position] = score
+
+        with self._results_lock:
+            self._results[term] = scores
+            while len(self._results) > self.max_cached_queries:
+                self._results.popitem(last=False)
+        return scores
+
+    def narrowest_cached_match(self, term: str) -> Optional[Dict[int, float]]:
+        """Smallest cached result that is guaranteed to contain every match for `term`
+
+        Text containing the characters of `term` in order also contains those
+        of any part of it, so the matches of a cached term that is a substring
+        of `term` are a superset.
+        """
+        supersets = [scores for cached, scores in self._results.items() if cached in term]
+        return min(supersets, key=len, default=None)
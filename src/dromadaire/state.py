@@ -1,10 +1,218 @@
 import asyncio
-from typing import List, Tuple, Optional
-from dromadaire.confiture import get_async_chain, get_chain, normalize_address, LiquidityPool, TokenBalance
+import itertools
+import time
+from contextlib import AsyncExitStack
+from typing import AsyncIterator, Callable, Dict, FrozenSet, List, NamedTuple, Set, Tuple, Optional
+from dromadaire.balances import BalanceTracker
+from dromadaire.cache import PoolCache
+from dromadaire.confiture import (
+    AsyncChain, BalanceCalls, get_async_chain, get_chain, LiquidityPool, Price, rpc_endpoint, Token,
+    TokenBalance,
+)
+from dromadaire.details import PoolDetails, PoolDetailsLoader
+from dromadaire.metrics import MetricsEngine, PoolMetrics, PriceKey
+from dromadaire.pipeline import AdaptiveLimit, chain_limits
+from dromadaire.prices import PriceService, pool_prices
+from dromadaire.search import PoolSearchIndex
+from dromadaire.tokens import TokenRegistry
+
+
+class PoolChunk(NamedTuple):
+    """Pools of one chain produced by `AppState.iter_pools`
+
+    `pools` is the complete pool list of the chain and replaces any earlier chunk
+    for the same chain. Chunks served from the on-disk cache are `stale` and are
+    followed by a fresh chunk (or an error) once the chain has been revalidated.
+    """
+    chain_id: str
+    pools: List[LiquidityPool]
+    stale: bool = False
+    error: Optional[Exception] = None
+
+
+class BalanceChunk(NamedTuple):
+    """Balances of one chain produced by `AppState.iter_balances`
+
+    `balances` add to the earlier chunks of the same chain. The last chunk of
+    a chain is `done`, and carries the chain's error if its balances failed.
+    """
+    chain_id: str
+    balances: List[TokenBalance]
+    done: bool = False
+    error: Optional[Exception] = None
+
+
+class PoolStore:
+    """Every loaded pool, with hash indexes for constant time lookups
+
+    Pools are indexed by LP address, chain id, token address and unordered
+    token pair; addresses are compared lowercased. Upserting or deleting a pool
+    costs the same however many pools are loaded. Each chain also carries a
+    version, unique across chains and bumped whenever its pools are replaced.
+    """
+
+    def __init__(self):
+        self.by_lp: Dict[str, LiquidityPool] = {}
+        # Index key to pools by LP address; chains keep their pools in load order
+        self.by_chain: Dict[str, Dict[str, LiquidityPool]] = {}
+        self.by_token: Dict[str, Dict[str, LiquidityPool]] = {}
+        self.by_pair: Dict[FrozenSet[str], Dict[str, LiquidityPool]] = {}
+        self.chain_of: Dict[str, str] = {}
+        self.chain_versions: Dict[str, int] = {}
+        self._versions = itertools.count(1)
+
+    @staticmethod
+    def pool_tokens(pool: LiquidityPool) -> List[str]:
+        return [token.token_address.lower() for token in (pool.token0, pool.token1) if token]
+
+    def get(self, lp: str) -> Optional[LiquidityPool]:
+        """Pool with an LP address"""
+        return self.by_lp.get(str(lp).lower())
+
+    def chain_pools(self, chain_id: str) -> List[LiquidityPool]:
+        """Pools of a chain, in load order"""
+        return list(self.by_chain.get(chain_id, {}).values())
+
+    def token_pools(self, token_address: str) -> List[LiquidityPool]:
+        """Pools holding a token"""
+        return list(self.by_token.get(token_address.lower(), {}).values())
+
+    def pair_pools(self, token_a: str, token_b: str) -> List[LiquidityPool]:
+        """Pools of a token pair, in either order"""
+        return list(self.by_pair.get(frozenset((token_a.lower(), token_b.lower())), {}).values())
+
+    def chain_tokens(self, chain_id: str) -> List[Token]:
+        """Tokens held by a chain's pools, one instance per address"""
+        tokens: Dict[str, Token] = {}
+        for pool in self.by_chain.get(chain_id, {}).values():
+            for token in (pool.token0, pool.token1):
+                if token:
+                    tokens.setdefault(token.token_address.lower(), token)
+        return list(tokens.values())
+
+    def version(self, pool: LiquidityPool) -> int:
+        """Data version of a pool's chain, 0 for pools that are not loaded"""
+        return self.chain_versions.get(self.chain_of.get(pool.lp.lower()), 0)
+
+    def upsert(self, chain_id: str, pool: LiquidityPool) -> None:
+        """Add a pool, replacing any pool with the same LP address"""
+        lp = pool.lp.lower()
+        if lp in self.by_lp:
+            self.delete(lp)
+        self.by_lp[lp] = pool
+        self.chain_of[lp] = chain_id
+        self.by_chain.setdefault(chain_id, {})[lp] = pool
+        tokens = self.pool_tokens(pool)
+        for token_address in tokens:
+            self.by_token.setdefault(token_address, {})[lp] = pool
+        self.by_pair.setdefault(frozenset(tokens), {})[lp] = pool
+
+    def delete(self, lp: str) -> None:
+        """Remove the pool with an LP address, if loaded"""
+        lp = lp.lower()
+        pool = self.by_lp.pop(lp, None)
+        if pool is None:
+            return
+        chain_id = self.chain_of.pop(lp)
+        self.discard(self.by_chain, chain_id, lp)
+        tokens = self.pool_tokens(pool)
+        for token_address in tokens:
+            self.discard(self.by_token, token_address, lp)
+        self.discard(self.by_pair, frozenset(tokens), lp)
+
+    @staticmethod
+    def discard(index: dict, key, lp: str) -> None:
+        """Remove a pool from an index entry, dropping the entry once empty"""
+        pools = index.get(key)
+        if pools is not None:
+            pools.pop(lp, None)
+            if not pools:
+                del index[key]
+
+    def replace_chain(self, chain_id: str, pools: List[LiquidityPool]) -> None:
+        """Swap in a fresh pool list for a chain"""
+        self.drop_chain(chain_id)
+        for pool in pools:
+            self.upsert(chain_id, pool)
+        self.chain_versions[chain_id] = next(self._versions)
+
+    def drop_chain(self, chain_id: str) -> None:
+        """Forget every pool of a chain"""
+        for lp in list(self.by_chain.get(chain_id, {})):
+            self.delete(lp)
+        self.chain_versions.pop(chain_id, None)
+
+
+class ChainConnections:
+    """Long-lived chain connections shared by everything that talks to a chain
+
+    A chain is entered once on first use and stays open, so pool loading and
+    balance fetching reuse the same HTTP session and web3 provider. Connections
+    are closed when their chain is deselected or the app exits, while what was
+    learnt about each RPC endpoint is kept for the lifetime of the app.
+    """
+
+    def __init__(self):
+        self._stacks: Dict[str, AsyncExitStack] = {}
+        self._chains: Dict[str, AsyncChain] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._closing: Set[asyncio.Task] = set()
+        # Adaptive concurrency limit by RPC endpoint, prepared balance calls by chain id
+        self._endpoint_limits: Dict[str, AdaptiveLimit] = {}
+        self._balance_calls: Dict[str, BalanceCalls] = {}
+
+    async def connect(self, chain: AsyncChain) -> AsyncChain:
+        """Get the open connection for a chain, opening it if needed"""
+        chain_id = chain.chain_id
+        async with self._locks.setdefault(chain_id, asyncio.Lock()):
+            if chain_id not in self._chains:
+                stack = AsyncExitStack()
+                self._chains[chain_id] = await stack.enter_async_context(chain)
+                self._stacks[chain_id] = stack
+        return self._chains[chain_id]
+
+    def endpoint_limit(self, chain: AsyncChain) -> AdaptiveLimit:
+        """Concurrency limit shared by everything that talks to a chain's RPC endpoint"""
+        endpoint = rpc_endpoint(chain)
+        if endpoint not in self._endpoint_limits:
+            self._endpoint_limits[endpoint] = AdaptiveLimit.for_chain(chain_limits(chain.chain_id))
+        return self._endpoint_limits[endpoint]
+
+    def balance_calls(self, chain_id: str) -> BalanceCalls:
+        """Prepared `balanceOf` calls of a chain"""
+        if chain_id not in self._balance_calls:
+            self._balance_calls[chain_id] = BalanceCalls()
+        return self._balance_calls[chain_id]
+
+    async def close(self, chain_id: str) -> None:
+        """Close the connection for a chain, if it is open"""
+        self._chains.pop(chain_id, None)
+        stack = self._stacks.pop(chain_id, None)
+        if stack is not None:
+            await stack.aclose()
+
+    def release(self, chain_id: str) -> None:
+        """Close the connection for a chain in the background"""
+        if chain_id not in self._stacks:
+            return
+        task = asyncio.get_running_loop().create_task(self.close(chain_id))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def close_all(self) -> None:
+        """Close every open connection"""
+        await asyncio.gather(*[self.close(chain_id) for chain_id in list(self._stacks)], return_exceptions=True)
 
 
 class AppState:
     """Centralized state management for Dromadaire"""
+
+    # Deadline for loading pools from a single chain, in seconds
+    pool_load_timeout: float = 30.0
+    # Maximum number of chains loading pools at the same time
+    max_concurrent_chains: int = 4
+    # Maximum number of pools a search returns, best matches first
+    max_search_results: int = 1000
     
     @property
     def supported_chains(self) -> List[Tuple[str, str]]:
@@ -42,6 +250,29 @@ class AppState:
     def __init__(self):
         self._selected_chains: List[Tuple[str, str]] = self.default_chains.copy()
         self.chains = [get_async_chain(chain_id) for chain_id, _ in self.selected_chains]
+        # Errors from the last pool load, keyed by chain id
+        self.pool_errors: Dict[str, Exception] = {}
+        self.pool_cache = PoolCache()
+        self.connections = ChainConnections()
+        # Loaded pools of every selected chain, and when each chain was last fetched fresh
+        self.pool_store = PoolStore()
+        self.pools_loaded_at: Dict[str, float] = {}
+        # Pools of the selected chains in display order
+        self.pools: List[LiquidityPool] = []
+        # USD prices shared by pools, metrics and balances
+        self.price_service = PriceService(self.fetch_prices)
+        # Token records of every chain, kept on disk between runs
+        self.token_registry = TokenRegistry(self.fetch_tokens)
+        # Wallet balances of every chain, kept between wallet refreshes
+        self.balance_trackers: Dict[str, BalanceTracker] = {}
+        self.metrics_engine = MetricsEngine()
+        # On-chain details of highlighted pools and their neighbours
+        self.pool_details = PoolDetailsLoader(self.fetch_pool_details)
+        self._search_index: Optional[PoolSearchIndex] = None
+
+    def chain_name(self, chain_id: str) -> str:
+        """Get the display name of a supported chain"""
+        return dict(self.supported_chains).get(chain_id, chain_id)
 
     def select_chains(self, chains: List[str]) -> List[Tuple[str, str]]:
         """Update selected chains"""
@@ -61,103 +292,259 @@ class AppState:
                 new_chains.append(get_async_chain(chain_id))
         
         self.chains = new_chains
+
+        # Forget pools of deselected chains, no need to touch the network for that
+        selected_ids = {chain_id for chain_id, _ in self.selected_chains}
+        for chain_id in list(self.pool_store.by_chain):
+            if chain_id not in selected_ids:
+                self.set_chain_pools(chain_id, None)
+        for chain_id in existing_chains:
+            if chain_id not in selected_ids:
+                self.connections.release(chain_id)
         return self.selected_chains
 
+    @property
+    def search_index(self) -> PoolSearchIndex:
+        """Search index over the loaded pools, built on first use after they change
+
+        New prices only swap in the index's TVL and APR columns.
+        """
+        metrics = self.pool_metrics()
+        if self._search_index is None or self._search_index.pools is not self.pools:
+            self._search_index = PoolSearchIndex(self.pools, metrics)
+        elif self._search_index.metrics is not metrics:
+            self._search_index.set_metrics(metrics)
+        return self._search_index
+
+    @property
+    def prices(self) -> Dict[PriceKey, float]:
+        """Latest known USD price of every token"""
+        return self.price_service.prices
+
+    def pool_metrics(self) -> PoolMetrics:
+        """USD TVL and APRs of the loaded pools, recomputed only once pools or prices change"""
+        return self.metrics_engine.compute(self.pools, self.prices)
+
+    def pool_version(self, pool: LiquidityPool) -> int:
+        """Data version of a pool, unique across chains and changed whenever its chain's pools are replaced"""
+        return self.pool_store.version(pool)
+
+    def unloaded_chains(self) -> List[str]:
+        """Selected chains whose pools have not been fetched fresh yet"""
+        return [chain_id for chain_id, _ in self.selected_chains if chain_id not in self.pools_loaded_at]
+
+    def set_chain_pools(self, chain_id: str, pools: Optional[List[LiquidityPool]], fresh: bool = False) -> None:
+        """Replace the pools of a chain, or drop them when `pools` is None"""
+        if pools is None:
+            self.pool_store.drop_chain(chain_id)
+            self.pools_loaded_at.pop(chain_id, None)
+        else:
+            self.pool_store.replace_chain(chain_id, pools)
+            if fresh:
+                self.pools_loaded_at[chain_id] = time.time()
+                # Pools come priced, no need to fetch those prices again for a while
+                self.price_service.seed(pool_prices(pools))
+        self.pools = [pool for chain_id, _ in self.selected_chains for pool in self.pool_store.chain_pools(chain_id)]
+
+    async def load_chain_pools(self, chain, semaphore: Optional[asyncio.Semaphore] = None) -> List[LiquidityPool]:
+        """Load pools from a single chain within `pool_load_timeout`"""
+        async def fetch():
+            connection = await self.connections.connect(chain)
+            return await connection.get_pools()
+
+        async with semaphore or asyncio.Semaphore(1):
+            try:
+                return await asyncio.wait_for(fetch(), timeout=self.pool_load_timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"timed out after {self.pool_load_timeout:g}s") from None
+
+    async def iter_pools(self, chain_ids: Optional[List[str]] = None) -> AsyncIterator[PoolChunk]:
+        """Load pools from selected chains concurrently, yielding each chain's pools as soon as they arrive
+
+        Only `chain_ids` are loaded when given, otherwise every selected chain.
+        Chains without pools in memory first get their cached snapshot as a stale
+        chunk while every chain is revalidated in the background. Each chain then
+        yields exactly one non-stale chunk: its fresh pools, or the error that
+        prevented loading them, which is also recorded in `pool_errors`.
+        Loaded pools are kept in `pool_store`.
+        """
+        chains = [chain for chain in self.chains if chain_ids is None or chain.chain_id in chain_ids]
+        semaphore = asyncio.Semaphore(self.max_concurrent_chains)
+        for chain in chains:
+            self.pool_errors.pop(chain.chain_id, None)
+
+        async def load_cached(chain):
+            if chain.chain_id in self.pool_store.by_chain:
+                return None
+            snapshot = await asyncio.to_thread(self.pool_cache.load, chain.chain_id)
+            return PoolChunk(chain.chain_id, snapshot.pools, stale=True) if snapshot else None
+
+        async def load(chain):
+            try:
+                pools = await self.load_chain_pools(chain, semaphore)
+            except Exception as e:
+                return PoolChunk(chain.chain_id, [], error=e)
+            # Hand the pools over first, the snapshot is written in the background
+            self.pool_cache.save_later(chain.chain_id, pools)
+            return PoolChunk(chain.chain_id, pools)
+
+        tasks = [asyncio.create_task(load_cached(chain)) for chain in chains]
+        tasks += [asyncio.create_task(load(chain)) for chain in chains]
+        revalidated = set()
+        try:
+            for next_chunk in asyncio.as_completed(tasks):
+                chunk = await next_chunk
+                # Skip missing snapshots and snapshots that lost the race against the network
+                if chunk is None or (chunk.stale and chunk.chain_id in revalidated):
+                    continue
+                # The chain may have been deselected while it was loading
+                if chunk.chain_id not in [chain_id for chain_id, _ in self.selected_chains]:
+                    continue
+                if chunk.error is not None:
+                    self.pool_errors[chunk.chain_id] = chunk.error
+                else:
+                    if not chunk.stale:
+                        revalidated.add(chunk.chain_id)
+                    self.set_chain_pools(chunk.chain_id, chunk.pools, fresh=not chunk.stale)
+                yield chunk
+        finally:
+            # Don't leave chains loading in the background if the consumer stops early
+            for task in tasks:
+                task.cancel()
+
     async def load_pools(self) -> List[LiquidityPool]:
-        """Load pools from all selected chains concurrently"""
-        all_pools = []
-        for chain in self.chains:
-            async with chain:
-                pools = await chain.get_pools()
-                all_pools.extend(pools)
-        return all_pools
+        """Load pools from all selected chains concurrently
 
-    async def get_balances(self) -> List[TokenBalance]:
-        """Get all token balances from all selected chains concurrently"""
-        async def get_chain_balances(chain):
-            async with chain:
-                return await chain.get_token_balances()
-        
-        # Use asyncio.gather to fetch balances from all chains in parallel
-        balance_results = await asyncio.gather(
-            *[get_chain_balances(chain) for chain in self.chains],
-            return_exceptions=True
+        A chain that fails or misses its deadline does not affect the others:
+        its last cached pools are used if there are any, and the error is
+        recorded in `pool_errors`.
+        """
+        async for _ in self.iter_pools():
+            pass
+        return self.pools
+
+    def find_chain(self, chain_id: str) -> Optional[AsyncChain]:
+        """Selected chain with a chain id"""
+        return next((chain for chain in self.chains if chain.chain_id == chain_id), None)
+
+    async def fetch_prices(self, chain_id: str, tokens: List[Token]) -> List[Price]:
+        """Fetch USD prices of a chain's tokens, see `price_service` for cached ones"""
+        chain = self.find_chain(chain_id)
+        if chain is None:
+            return []
+        connection = await self.connections.connect(chain)
+        return await connection.get_prices(await self.pricing_tokens(connection, tokens))
+
+    async def pricing_tokens(self, chain: AsyncChain, tokens: List[Token]) -> List[Token]:
+        """`tokens` plus the chain's native and stable tokens
+
+        Sugar prices every token through the native token and the stable token,
+        and fails on batches that miss either of them.
+        """
+        required = {chain.settings.native_token_symbol.lower(), chain.settings.stable_token_addr.lower()}
+        missing = required - {token.token_address.lower() for token in tokens}
+        if not missing:
+            return tokens
+        known = await self.token_registry.get_tokens(chain.chain_id, self.pool_store.chain_tokens(chain.chain_id))
+        return list(tokens) + [token for token in known if token.token_address.lower() in missing]
+
+    async def fetch_tokens(self, chain_id: str) -> List[Token]:
+        """Fetch every token of a chain, see `token_registry` for stored ones"""
+        chain = self.find_chain(chain_id)
+        if chain is None:
+            return []
+        connection = await self.connections.connect(chain)
+        return await connection.get_all_tokens()
+
+    async def fetch_pool_details(self, pool: LiquidityPool) -> Optional[PoolDetails]:
+        """Latest gauge epoch of a pool, with the on-chain state of concentrated liquidity pools
+
+        None for pools of chains that are no longer selected.
+        """
+        chain = self.find_chain(str(pool.chain_id))
+        if chain is None:
+            return None
+        connection = await self.connections.connect(chain)
+
+        async def fetch() -> PoolDetails:
+            epochs, *cl_state = await asyncio.gather(
+                connection.get_pool_epochs(pool.lp),
+                *([connection.get_cl_pool_state(pool)] if pool.is_cl else []),
+            )
+            return PoolDetails(
+                epoch=max(epochs, key=lambda epoch: epoch.ts, default=None),
+                cl_state=cl_state[0] if cl_state else None,
+            )
+
+        return await asyncio.wait_for(fetch(), timeout=self.pool_load_timeout)
+
+    async def get_chain_balances(
+        self, chain: AsyncChain, on_batch: Optional[Callable[[List[TokenBalance]], None]] = None
+    ) -> List[TokenBalance]:
+        """Token balances on one chain, see `BalanceTracker.refresh`"""
+        connection = await self.connections.connect(chain)
+        tracker = self.balance_trackers.setdefault(chain.chain_id, BalanceTracker(chain.chain_id))
+        return await tracker.refresh(
+            connection,
+            get_tokens=lambda: self.token_registry.get_tokens(
+                chain.chain_id, self.pool_store.chain_tokens(chain.chain_id)
+            ),
+            get_prices=lambda tokens: self.price_service.get_prices(chain.chain_id, tokens),
+            on_batch=on_batch,
+            limit=self.connections.endpoint_limit(connection),
+            calls=self.connections.balance_calls(chain.chain_id),
         )
+
+    async def iter_balances(self) -> AsyncIterator[BalanceChunk]:
+        """Stream token balances of all selected chains as each batch of each chain is read
+
+        Every chain ends with a `done` chunk, failed chains carry their error in it.
+        """
+        chunks: asyncio.Queue[BalanceChunk] = asyncio.Queue()
+
+        async def load(chain: AsyncChain) -> None:
+            try:
+                await self.get_chain_balances(
+                    chain, on_batch=lambda balances: chunks.put_nowait(BalanceChunk(chain.chain_id, balances))
+                )
+                chunks.put_nowait(BalanceChunk(chain.chain_id, [], done=True))
+            except Exception as e:
+                chunks.put_nowait(BalanceChunk(chain.chain_id, [], done=True, error=e))
+
+        tasks = [asyncio.create_task(load(chain)) for chain in self.chains]
+        pending = len(tasks)
+        try:
+            while pending:
+                chunk = await chunks.get()
+                if chunk.done:
+                    pending -= 1
+                yield chunk
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def get_balances(self) -> List[TokenBalance]:
+        """Get all token balances from all selected chains concurrently
         
-        # Flatten results and filter out exceptions
+        Chains whose balances fail are left out.
+        """
         all_balances = []
-        for result in balance_results:
-            if not isinstance(result, Exception):
-                all_balances.extend(result)
-        
+        async for chunk in self.iter_balances():
+            all_balances.extend(chunk.balances)
         return all_balances
 
-    def filter_pools(self, pools: List[LiquidityPool], query: str) -> List[LiquidityPool]:
-        if not query or not query.strip():
+    def filter_pools(
+        self, pools: List[LiquidityPool], query: str, sort: Optional[Tuple[str, bool]] = None
+    ) -> List[LiquidityPool]:
+        """Best matching pools for a search query, optionally sorted on a (column, descending) pair
+
+        See `PoolSearchIndex.search`.
+        """
+        if not (query and query.strip()) and not sort:
             return pools
-        
-        query = query.strip().lower()
-        try:
-            normalized_query = normalize_address(query) if query.startswith('0x') else None
-        except Exception:
-            normalized_query = None
-        
-        filtered_pools = []
-        
-        for pool in pools:
-            # Check for exact matches on pool address (if pool has address/lp attribute)
-            if hasattr(pool, 'address') and normalized_query:
-                if normalize_address(pool.address).lower() == normalized_query.lower():
-                    filtered_pools.append(pool)
-                    continue
-            elif hasattr(pool, 'lp') and normalized_query:
-                if normalize_address(pool.lp).lower() == normalized_query.lower():
-                    filtered_pools.append(pool)
-                    continue
-            
-            # Check for exact matches on pool name (if pool has name attribute)
-            if hasattr(pool, 'name') and pool.name:
-                if query == pool.name.lower():
-                    filtered_pools.append(pool)
-                    continue
-            
-            # Check token addresses
-            if normalized_query:
-                token0_addr = getattr(pool.token0, 'address', None)
-                token1_addr = getattr(pool.token1, 'address', None)
-                
-                if token0_addr and normalize_address(token0_addr).lower() == normalized_query.lower():
-                    filtered_pools.append(pool)
-                    continue
-                elif token1_addr and normalize_address(token1_addr).lower() == normalized_query.lower():
-                    filtered_pools.append(pool)
-                    continue
-            
-            # Fuzzy match on token names/symbols
-            token0_symbol = getattr(pool.token0, 'symbol', '').lower()
-            token1_symbol = getattr(pool.token1, 'symbol', '').lower()
-            token0_name = getattr(pool.token0, 'name', '').lower()
-            token1_name = getattr(pool.token1, 'name', '').lower()
-            
-            if (query in token0_symbol or query in token1_symbol or 
-                query in token0_name or query in token1_name):
-                filtered_pools.append(pool)
-                continue
-            
-            # Fuzzy match on chain name
-            chain_name = getattr(pool, 'chain_name', '').lower()
-            if query in chain_name:
-                filtered_pools.append(pool)
-                continue
-            
-            # Fuzzy match on pool name (if exists)
-            if hasattr(pool, 'name') and pool.name:
-                if query in pool.name.lower():
-                    filtered_pools.append(pool)
-                    continue
-        
-        return filtered_pools
-        
+        # Loaded pools are indexed once, any other list gets a one-off index
+        index = self.search_index if pools is self.pools else PoolSearchIndex(pools)
+        return index.search(query, limit=self.max_search_results, sort=sort)
 
 
 def state() -> 'AppState':
@@ -0,0 +1,80 @@
+import asyncio
+import time
+from dataclasses import astuple
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+from dromadaire.cache import TokenCache, TokenSnapshot
+from dromadaire.confiture import Token
+
+TokenFetcher = Callable[[str], Awaitable[List[Token]]]
+
+
+def same_token(known: Optional[Token], token: Token) -> bool:
+    """Whether a token record is unchanged, field by field
+
+    Sugar's `Token.__eq__` only compares addresses and chain ids.
+    """
+    return known is not None and astuple(known) == astuple(token)
+
+
+class TokenRegistry:
+    """Token records of each chain, kept on disk between runs
+
+    A chain's full token list is only downloaded again once it is older than
+    `max_age` seconds, or when loaded pools hold a listed token the registry
+    has never seen. Tokens identical to ones held by loaded pools are replaced by
+    the pools' instances, so both share a single `Token` per token.
+    """
+
+    max_age: float = 24 * 60 * 60
+
+    def __init__(self, fetch: TokenFetcher, cache: Optional[TokenCache] = None):
+        self.fetch = fetch
+        self.cache = cache or TokenCache()
+        # Chain id to its tokens by lowercased address
+        self._tokens: Dict[str, Dict[str, Token]] = {}
+        self._fetched_at: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def intern(self, chain_id: str, tokens: Iterable[Token]) -> None:
+        """Share the instances of known tokens that are identical to `tokens`"""
+        known = self._tokens.get(chain_id, {})
+        for token in tokens:
+            key = token.token_address.lower()
+            if key in known and known[key] is not token and same_token(known[key], token):
+                known[key] = token
+
+    def is_stale(self, chain_id: str, pool_tokens: List[Token]) -> bool:
+        if chain_id not in self._tokens or time.time() - self._fetched_at[chain_id] > self.max_age:
+            return True
+        known = self._tokens[chain_id]
+        return any(token.listed and token.token_address.lower() not in known for token in pool_tokens)
+
+    async def get_tokens(self, chain_id: str, pool_tokens: Iterable[Token] = ()) -> List[Token]:
+        """Every token of a chain, downloaded only if the stored list is stale
+
+        `pool_tokens` are the tokens of the chain's loaded pools.
+        """
+        pool_tokens = list(pool_tokens)
+        lock = self._locks.setdefault(chain_id, asyncio.Lock())
+        # One download per chain, however many screens ask at once
+        async with lock:
+            if chain_id not in self._tokens:
+                snapshot = await asyncio.to_thread(self.cache.load, chain_id)
+                if snapshot is not None:
+                    self.remember(snapshot)
+            if self.is_stale(chain_id, pool_tokens):
+                snapshot = TokenSnapshot(chain_id=chain_id, fetched_at=time.time(), tokens=await self.fetch(chain_id))
+                self.remember(snapshot)
+                await asyncio.to_thread(self.cache.save, snapshot)
+        self.intern(chain_id, pool_tokens)
+        return list(self._tokens[chain_id].values())
+
+    def remember(self, snapshot: TokenSnapshot) -> None:
+        known = self._tokens.get(snapshot.chain_id, {})
+        tokens = {}
+        for token in snapshot.tokens:
+            key = token.token_address.lower()
+            # Keep instances already handed out for tokens that did not change
+            tokens[key] = known[key] if same_token(known.get(key), token) else token
+        self._tokens[snapshot.chain_id] = tokens
+        self._fetched_at[snapshot.chain_id] = snapshot.fetched_at
@@ -1,8 +1,33 @@
-from textual.widgets import Label
+from typing import Any, Callable, Hashable, Iterable, Optional, Sequence, Tuple
+from rich.cells import set_cell_size
+from rich.segment import Segment
+from textual import events
+from textual.binding import Binding
+from textual.geometry import Size
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+from textual.widgets import DataTable, Label
 from textual.reactive import reactive
 from textual.message import Message
 
 
+def format_address(address: str) -> str:
+    """Format address to shortened version: 0xac48...d1a24"""
+    if not address:
+        return ""
+    
+    # Ensure address starts with 0x
+    if not address.startswith("0x"):
+        address = "0x" + address
+    
+    # Return full address if it's too short to shorten
+    if len(address) <= 10:
+        return address
+    
+    # Return shortened format: first 6 chars + ... + last 5 chars
+    return f"{address[:6]}...{address[-5:]}"
+
+
 class AddressWidget(Label):
     """Widget for displaying shortened addresses in format: 0xac48...d1a24"""
     
@@ -28,21 +53,262 @@ class AddressWidget(Label):
     
     def format_address(self, address: str) -> str:
         """Format address to shortened version: 0xac48...d1a24"""
-        if not address:
-            return ""
-        
-        # Ensure address starts with 0x
-        if not address.startswith("0x"):
-            address = "0x" + address
-        
-        # Return full address if it's too short to shorten
-        if len(address) <= 10:
-            return address
-        
-        # Return shortened format: first 6 chars + ... + last 5 chars
-        return f"{address[:6]}...{address[-5:]}"
+        return format_address(address)
     
     def on_mount(self) -> None:
         """Initialize the widget when mounted"""
         if self.address:
-            self.update(self.format_address(self.address))
\ No newline at end of file
+            self.update(self.format_address(self.address))
+
+
+class KeyedCell(str):
+    """Text cell that remembers the key of the row it belongs to"""
+
+    row_key: Hashable
+
+    def __new__(cls, value: str, row_key: Hashable) -> "KeyedCell":
+        cell = super().__new__(cls, value)
+        cell.row_key = row_key
+        return cell
+
+
+class SyncedDataTable(DataTable):
+    """DataTable that applies new contents as a diff against the rows already shown
+    
+    Rows are matched by key: new rows are added, missing rows are removed and
+    only cells whose value changed are updated. The highlighted row keeps the
+    cursor and the scroll position is left alone.
+    """
+
+    # Removing a row re-indexes every row after it, so past this many removals
+    # it is cheaper to rebuild the table from scratch
+    max_row_removals: int = 64
+
+    def sync_rows(self, rows: Iterable[Tuple[str, Sequence[Any]]]) -> None:
+        """Make the table show exactly `rows`, given as (key, cells) pairs in display order
+        
+        The first cell of every row must be a string.
+        """
+        wanted = {key: (KeyedCell(cells[0], key), *cells[1:]) for key, cells in rows}
+        highlighted_key = self.highlighted_row_key()
+        stale_keys = [row_key for row_key in self.rows if row_key.value not in wanted]
+
+        if len(stale_keys) > self.max_row_removals:
+            self.clear()
+        else:
+            for row_key in stale_keys:
+                self.remove_row(row_key)
+
+        column_keys = [column.key for column in self.ordered_columns]
+        for key, cells in wanted.items():
+            if key not in self.rows:
+                self.add_row(*cells, key=key)
+                continue
+            for column_key, current, cell in zip(column_keys, self.get_row(key), cells):
+                if current != cell:
+                    self.update_cell(key, column_key, cell)
+
+        # Rows that were added back after a removal land at the bottom: restore display order
+        if [row.key.value for row in self.ordered_rows] != list(wanted):
+            positions = {key: index for index, key in enumerate(wanted)}
+            self.sort(column_keys[0], key=lambda cell: positions[cell.row_key])
+
+        if highlighted_key in wanted and self.highlighted_row_key() != highlighted_key:
+            self.move_cursor(row=self.get_row_index(highlighted_key))
+
+    def highlighted_row_key(self):
+        """Key of the row under the cursor, or None for an empty table"""
+        if not self.row_count:
+            return None
+        return self.coordinate_to_cell_key(self.cursor_coordinate).row_key.value
+
+
+
+class VirtualTable(ScrollView, can_focus=True):
+    """Read-only table that formats and renders only the rows in view
+    
+    Rows are arbitrary objects; `row_key` and `row_cells` turn the visible ones
+    into a key and cell strings when they are drawn, so the table holds no
+    rendered cells and copes with row counts a DataTable can't.
+    """
+
+    DEFAULT_CSS = """
+    VirtualTable {
+        height: 1fr;
+        background: $surface;
+        color: $foreground;
+    }
+    VirtualTable > .virtual-table--header {
+        background: $panel;
+        text-style: bold;
+    }
+    VirtualTable > .virtual-table--cursor {
+        background: $block-cursor-background;
+        color: $block-cursor-foreground;
+        text-style: bold;
+    }
+    """
+
+    COMPONENT_CLASSES = {"virtual-table--header", "virtual-table--cursor"}
+
+    BINDINGS = [
+        Binding("up", "cursor_up", "Cursor up", show=False),
+        Binding("down", "cursor_down", "Cursor down", show=False),
+        Binding("pageup", "page_up", "Page up", show=False),
+        Binding("pagedown", "page_down", "Page down", show=False),
+        Binding("home", "first_row", "First row", show=False),
+        Binding("end", "last_row", "Last row", show=False),
+    ]
+
+    cursor_row: reactive[int] = reactive(0)
+
+    class RowHighlighted(Message):
+        """Sent when the cursor moves to a row"""
+        def __init__(self, table: "VirtualTable", row_key: str, row: Any) -> None:
+            super().__init__()
+            self.table = table
+            self.row_key = row_key
+            self.row = row
+
+        @property
+        def control(self) -> "VirtualTable":
+            return self.table
+
+    class HeaderSelected(Message):
+        """Sent when a column header is clicked"""
+        def __init__(self, table: "VirtualTable", column_index: int) -> None:
+            super().__init__()
+            self.table = table
+            self.column_index = column_index
+
+        @property
+        def control(self) -> "VirtualTable":
+            return self.table
+
+    def __init__(
+        self,
+        columns: Sequence[Tuple[str, int]],
+        row_key: Callable[[Any], str],
+        row_cells: Callable[[Any], Sequence[str]],
+        **kwargs,
+    ):
+        """Create a table with (label, width) columns"""
+        super().__init__(**kwargs)
+        self.columns = list(columns)
+        self.row_key = row_key
+        self.row_cells = row_cells
+        self.rows: Sequence[Any] = []
+
+    @property
+    def row_count(self) -> int:
+        return len(self.rows)
+
+    @property
+    def visible_row_count(self) -> int:
+        """Number of rows that fit below the header"""
+        return max(self.scrollable_content_region.height - 1, 1)
+
+    def set_rows(self, rows: Sequence[Any]) -> None:
+        """Show new rows, keeping the cursor on the same row key if it is still there"""
+        highlighted_key = self.highlighted_row_key()
+        self.rows = rows
+        # Each cell is padded by a space on both sides, the header takes a line
+        self.virtual_size = Size(sum(width + 2 for _, width in self.columns), len(rows) + 1)
+
+        cursor_row = min(self.cursor_row, max(len(rows) - 1, 0))
+        if highlighted_key is not None:
+            index = self.get_row_index(highlighted_key)
+            if index is not None:
+                cursor_row = index
+        if cursor_row == self.cursor_row:
+            self.highlight_row()
+        self.cursor_row = cursor_row
+        self.refresh()
+
+    def highlighted_row_key(self) -> Optional[str]:
+        """Key of the row under the cursor, or None for an empty table"""
+        if not self.rows:
+            return None
+        return self.row_key(self.rows[self.cursor_row])
+
+    def get_row_index(self, row_key: str) -> Optional[int]:
+        """Index of the row with a key, if any"""
+        return next((index for index, row in enumerate(self.rows) if self.row_key(row) == row_key), None)
+
+    def move_cursor(self, row: int) -> None:
+        """Move the cursor to a row, clamped to the table"""
+        self.cursor_row = row
+
+    def validate_cursor_row(self, row: int) -> int:
+        return min(max(row, 0), max(len(self.rows) - 1, 0))
+
+    def watch_cursor_row(self, old_row: int, row: int) -> None:
+        # Keep the cursor in view
+        _, scroll_y = self.scroll_offset
+        if row < scroll_y:
+            self.scroll_to(y=row, animate=False)
+        elif row >= scroll_y + self.visible_row_count:
+            self.scroll_to(y=row - self.visible_row_count + 1, animate=False)
+        self.highlight_row()
+        self.refresh()
+
+    def highlight_row(self) -> None:
+        """Tell the parent which row is under the cursor"""
+        if self.rows:
+            row = self.rows[self.cursor_row]
+            self.post_message(self.RowHighlighted(self, self.row_key(row), row))
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        width = self.scrollable_content_region.width
+        if y == 0:
+            # The header stays put while rows scroll below it
+            cells = [label for label, _ in self.columns]
+            style = self.get_component_rich_style("virtual-table--header")
+        else:
+            index = scroll_y + y - 1
+            if index >= len(self.rows):
+                return Strip.blank(width, self.rich_style)
+            cells = self.row_cells(self.rows[index])
+            if index == self.cursor_row:
+                style = self.get_component_rich_style("virtual-table--cursor")
+            else:
+                style = self.rich_style
+
+        segments = [
+            Segment(f" {set_cell_size(str(cell), column_width)} ", style)
+            for cell, (_, column_width) in zip(cells, self.columns)
+        ]
+        strip = Strip(segments).extend_cell_length(scroll_x + width, style)
+        return strip.crop(scroll_x, scroll_x + width)
+
+    def on_click(self, event: events.Click) -> None:
+        scroll_x, scroll_y = self.scroll_offset
+        if event.y > 0:
+            self.move_cursor(scroll_y + event.y - 1)
+            return
+        # Find the column under the click, cells are padded by a space on both sides
+        x = scroll_x + event.x
+        for column_index, (_, width) in enumerate(self.columns):
+            if x < width + 2:
+                self.post_message(self.HeaderSelected(self, column_index))
+                return
+            x -= width + 2
+
+    def action_cursor_up(self) -> None:
+        self.move_cursor(self.cursor_row - 1)
+
+    def action_cursor_down(self) -> None:
+        self.move_cursor(self.cursor_row + 1)
+
+    def action_page_up(self) -> None:
+        self.move_cursor(self.cursor_row - self.visible_row_count)
+
+    def action_page_down(self) -> None:
+        self.move_cursor(self.cursor_row + self.visible_row_count)
+
+    def action_first_row(self) -> None:
+        self.move_cursor(0)
+
+    def action_last_row(self) -> None:
+        self.move_cursor(len(self.rows) - 1)
@@ -0,0 +1,18 @@
+import pytest
+from dromadaire.state import state
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Keep on-disk caches written during tests out of the user's cache directory"""
+    monkeypatch.setenv("DROMADAIRE_CACHE_DIR", str(tmp_path / "cache"))
+
+
+@pytest.fixture(autouse=True)
+def fresh_app_state():
+    """Give every test its own AppState, the singleton would carry loaded pools across tests"""
+    if hasattr(state, "_instance"):
+        del state._instance
+    yield
+    if hasattr(state, "_instance"):
+        del state._instance
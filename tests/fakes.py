@@ -0,0 +1,286 @@
+import asyncio
+from dataclasses import replace
+from types import SimpleNamespace
+from dromadaire.confiture import Amount, LiquidityPool, LiquidityPoolEpoch, Price, Token, TokenBalance
+from dromadaire.details import PoolDetails
+from dromadaire.state import BalanceChunk
+
+
+def create_mock_pools():
+    """Create a static list of mock LiquidityPools for testing"""
+    # Create mock tokens
+    eth_token = Token(
+        chain_id="10",
+        chain_name="Optimism",
+        token_address="0x4200000000000000000000000000000000000006",
+        symbol="WETH",
+        decimals=18,
+        listed=True
+    )
+    
+    usdc_token = Token(
+        chain_id="10",
+        chain_name="Optimism",
+        token_address="0x7F5c764cBc14f9669B88837ca1490cCa17c31607",
+        symbol="USDC",
+        decimals=6,
+        listed=True
+    )
+    
+    op_token = Token(
+        chain_id="10",
+        chain_name="Optimism",
+        token_address="0x4200000000000000000000000000000000000042",
+        symbol="OP",
+        decimals=18,
+        listed=True
+    )
+    
+    # Create mock prices
+    eth_price = Price(token=eth_token, price=2500.0)
+    usdc_price = Price(token=usdc_token, price=1.0)
+    op_price = Price(token=op_token, price=2.5)
+    
+    # Create mock amounts
+    eth_amount = Amount(token=eth_token, amount=1000000000000000000, price=eth_price)  # 1 WETH
+    usdc_amount = Amount(token=usdc_token, amount=2500000000, price=usdc_price)  # 2500 USDC
+    op_amount = Amount(token=op_token, amount=1000000000000000000, price=op_price)  # 1 OP
+    
+    # Create mock pools
+    pools = [
+        LiquidityPool(
+            chain_id="10",
+            chain_name="Optimism",
+            lp="0x1234567890abcdef1234567890abcdef12345678",
+            factory="0xF1046053aa5682b4F9a81b5481394DA16BE5FF5a",
+            symbol="WETH/USDC",
+            type=0,
+            is_stable=False,
+            is_cl=False,
+            total_supply=1000000.0,
+            decimals=18,
+            token0=eth_token,
+            reserve0=eth_amount,
+            token1=usdc_token,
+            reserve1=usdc_amount,
+            token0_fees=Amount(token=eth_token, amount=0, price=eth_price),
+            token1_fees=Amount(token=usdc_token, amount=0, price=usdc_price),
+            pool_fee=0.003,
+            gauge_total_supply=0.0,
+            emissions=Amount(token=op_token, amount=0, price=op_price),
+            emissions_token=op_token,
+            weekly_emissions=Amount(token=op_token, amount=0, price=op_price),
+            nfpm="0x0000000000000000000000000000000000000000",
+            alm="0x0000000000000000000000000000000000000000"
+        ),
+        LiquidityPool(
+            chain_id="10",
+            chain_name="Optimism",
+            lp="0xabcdef1234567890abcdef1234567890abcdef12",
+            factory="0xF1046053aa5682b4F9a81b5481394DA16BE5FF5a",
+            symbol="OP/USDC",
+            type=0,
+            is_stable=False,
+            is_cl=False,
+            total_supply=500000.0,
+            decimals=18,
+            token0=op_token,
+            reserve0=op_amount,
+            token1=usdc_token,
+            reserve1=usdc_amount,
+            token0_fees=Amount(token=op_token, amount=0, price=op_price),
+            token1_fees=Amount(token=usdc_token, amount=0, price=usdc_price),
+            pool_fee=0.003,
+            gauge_total_supply=0.0,
+            emissions=Amount(token=op_token, amount=0, price=op_price),
+            emissions_token=op_token,
+            weekly_emissions=Amount(token=op_token, amount=0, price=op_price),
+            nfpm="0x0000000000000000000000000000000000000000",
+            alm="0x0000000000000000000000000000000000000000"
+        )
+    ]
+    
+    return pools
+
+
+async def mock_load_chain_pools(chain, *args, **kwargs):
+    """Serve the mock pools for Optimism and no pools for any other chain"""
+    return create_mock_pools() if chain.chain_id == "10" else []
+
+
+def create_mock_pool_epoch(pool):
+    """Latest epoch of a mock pool: 1% of its reserves in fees and 50 of its emissions token in incentives"""
+    return LiquidityPoolEpoch(
+        ts=1760572800,  # Thursday, October 16 2025 00:00 UTC
+        lp=pool.lp,
+        pool=pool,
+        votes=1500000 * 10 ** 18,
+        emissions=2500 * 10 ** 18,
+        incentives=[replace(pool.emissions, amount=50 * 10 ** 18)],
+        fees=[replace(pool.reserve0, amount=pool.reserve0.amount // 100), replace(pool.reserve1, amount=pool.reserve1.amount // 100)],
+    )
+
+
+async def mock_fetch_pool_details(pool, *args, **kwargs):
+    """Serve the latest mock epoch of every pool"""
+    return PoolDetails(epoch=create_mock_pool_epoch(pool))
+
+
+async def mock_iter_balances(*args, **kwargs):
+    """Stream the mock balances as a single batch of Optimism, Lisk holds nothing"""
+    yield BalanceChunk("10", create_mock_balances())
+    yield BalanceChunk("10", [], done=True)
+    yield BalanceChunk("1135", [], done=True)
+
+
+def create_mock_wallet_address():
+    """Create a consistent mock wallet address for testing"""
+    return "0xac48b0f630f8c4c0c0b7a7f2c6e8f9b3a8d1a24"
+
+
+def create_mock_balances():
+    """Create a static list of mock TokenBalance objects for testing"""
+    # Reuse the tokens from mock pools
+    eth_token = Token(
+        chain_id="10",
+        chain_name="Optimism",
+        token_address="0x4200000000000000000000000000000000000006",
+        symbol="WETH",
+        decimals=18,
+        listed=True
+    )
+    
+    usdc_token = Token(
+        chain_id="10",
+        chain_name="Optimism",
+        token_address="0x7F5c764cBc14f9669B88837ca1490cCa17c31607",
+        symbol="USDC",
+        decimals=6,
+        listed=True
+    )
+    
+    op_token = Token(
+        chain_id="10",
+        chain_name="Optimism",
+        token_address="0x4200000000000000000000000000000000000042",
+        symbol="OP",
+        decimals=18,
+        listed=True
+    )
+    
+    # Create mock token balances
+    balances = [
+        TokenBalance(
+            token=eth_token,
+            balance=1.5,
+            price_stable=2500.0
+        ),
+        TokenBalance(
+            token=usdc_token,
+            balance=1000.0,
+            price_stable=1.0
+        ),
+        TokenBalance(
+            token=op_token,
+            balance=500.0,
+            price_stable=2.5
+        )
+    ]
+    
+    return balances
+
+
+
+
+def mock_tokens():
+    """WETH, USDC and OP, as held by the mock pools"""
+    weth_usdc, op_usdc = create_mock_pools()
+    return [weth_usdc.token0, weth_usdc.token1, op_usdc.token0]
+
+
+class FakeEth:
+    def __init__(self):
+        self.block = 100
+
+    @property
+    async def block_number(self):
+        return self.block
+
+
+class FakeChain:
+    """Minimal stand-in for AsyncChain serving canned pools, tokens, prices and balances
+
+    The wallet holds `holdings`, balances by token symbol, and the chain records
+    which balances get read.
+    """
+    def __init__(self, chain_id="10", pools=None, delay=0.0, error=None, tokens=None, holdings=None):
+        self.chain_id = chain_id
+        self.pools = pools or []
+        self.delay = delay
+        self.error = error
+        self.tokens = tokens or []
+        self.holdings = holdings or {}
+        self.settings = SimpleNamespace(
+            native_token_symbol="ETH", stable_token_addr="0x7F5c764cBc14f9669B88837ca1490cCa17c31607"
+        )
+        self.account = SimpleNamespace(address=create_mock_wallet_address())
+        self.web3 = SimpleNamespace(eth=FakeEth())
+        self.priced = []
+        self.transfers = set()
+        self.sweeps, self.reads = 0, []
+        # Symbols of tokens whose balance reads fail
+        self.failing = set()
+        # Gauge epochs of every pool
+        self.epochs = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return None
+
+    async def get_pools(self):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.pools
+
+    async def get_pool_epochs(self, lp, offset=0, limit=10):
+        return [epoch for epoch in self.epochs if epoch.lp == lp]
+
+    async def get_all_tokens(self):
+        return self.tokens
+
+    async def get_prices(self, tokens):
+        self.priced.append([token.symbol for token in tokens])
+        # Like sugar, which prices tokens through the native and the stable token
+        rates = {token.token_address: 1.0 for token in tokens}
+        for required in (self.settings.native_token_symbol, self.settings.stable_token_addr):
+            if required not in rates:
+                raise KeyError(f"prices requested without {required}, which sugar prices every token through")
+        return [Price(token=token, price=rates[token.token_address]) for token in tokens]
+
+    def balance(self, token, price_lookup):
+        return TokenBalance(token, self.holdings.get(token.symbol, 0.0), price_lookup.get(token.token_address, 0.0))
+
+    async def get_token_balances(
+        self, address, get_tokens, get_prices, on_batch=None, on_failure=None, limit=None, calls=None
+    ):
+        self.sweeps += 1
+        tokens = await get_tokens()
+        failed = [token for token in tokens if token.symbol in self.failing]
+        if failed and on_failure:
+            on_failure(failed, RuntimeError("rpc down"))
+        return [self.balance(token, {}) for token in tokens if self.holdings.get(token.symbol) and token not in failed]
+
+    async def get_transfer_tokens(self, address, from_block, to_block):
+        return self.transfers
+
+    async def process_token_batch(self, tokens, address, price_lookup, calls=None):
+        if any(token.symbol in self.failing for token in tokens):
+            raise RuntimeError("rpc down")
+        self.reads.extend(token.symbol for token in tokens)
+        return [self.balance(token, price_lookup) for token in tokens]
+
+    async def get_eth_balance(self, address, price_lookup):
+        return self.balance(SimpleNamespace(symbol="ETH", token_address="ETH"), price_lookup)
@@ -0,0 +1,90 @@
+import pytest
+from dromadaire.balances import BalanceTracker
+from dromadaire.confiture import Price
+from tests.fakes import FakeChain, mock_tokens
+
+
+@pytest.mark.asyncio
+async def test_balance_tracker_rereads_only_transferred_tokens():
+    weth, usdc, op = mock_tokens()
+    chain = FakeChain(tokens=[weth, usdc, op], holdings={"WETH": 1.0, "USDC": 100.0})
+
+    async def get_tokens():
+        return chain.tokens
+
+    async def get_prices(tokens):
+        return [Price(token=token, price=2.0) for token in tokens]
+
+    tracker = BalanceTracker("10")
+    await tracker.refresh(chain, get_tokens, get_prices)
+    assert chain.sweeps == 1
+
+    chain.holdings.update(USDC=0.0, OP=5.0)
+    chain.transfers = {usdc.token_address.lower(), op.token_address.lower()}
+    chain.web3.eth.block = 110
+    balances = await tracker.refresh(chain, get_tokens, get_prices)
+
+    assert chain.sweeps == 1
+    assert sorted(chain.reads) == ["OP", "USDC"]
+    assert sorted((balance.token.symbol, balance.balance) for balance in balances) == [
+        ("ETH", 0.0), ("OP", 5.0), ("WETH", 1.0)
+    ]
+    assert tracker.last_block == 110
+
+    chain.web3.eth.block = 110 + tracker.max_log_blocks + 1
+    await tracker.refresh(chain, get_tokens, get_prices)
+    assert chain.sweeps == 2
+
+
+@pytest.mark.asyncio
+async def test_balance_tracker_sweeps_again_after_a_partial_sweep():
+    chain = FakeChain(tokens=mock_tokens()[:2], holdings={"WETH": 1.0, "USDC": 100.0})
+    chain.failing = {"USDC"}
+
+    async def get_tokens():
+        return chain.tokens
+
+    async def get_prices(tokens):
+        return []
+
+    tracker = BalanceTracker("10")
+    balances = await tracker.refresh(chain, get_tokens, get_prices)
+    assert [balance.token.symbol for balance in balances] == ["WETH"]
+    assert tracker.last_block is None
+
+    chain.failing = set()
+    balances = await tracker.refresh(chain, get_tokens, get_prices)
+    assert chain.sweeps == 2
+    assert sorted(balance.token.symbol for balance in balances) == ["USDC", "WETH"]
+    assert tracker.last_block == 100
+
+
+@pytest.mark.asyncio
+async def test_balance_tracker_keeps_balances_it_failed_to_reread():
+    weth, usdc, op = mock_tokens()
+    chain = FakeChain(tokens=[weth, usdc, op], holdings={"WETH": 1.0, "USDC": 100.0})
+
+    async def get_tokens():
+        return chain.tokens
+
+    async def get_prices(tokens):
+        return []
+
+    tracker = BalanceTracker("10")
+    await tracker.refresh(chain, get_tokens, get_prices)
+
+    chain.holdings.update(USDC=50.0, OP=5.0)
+    chain.transfers = {usdc.token_address.lower(), op.token_address.lower()}
+    chain.failing = {"USDC"}
+    chain.web3.eth.block = 110
+    balances = await tracker.refresh(chain, get_tokens, get_prices)
+
+    # USDC and OP share the failed batch: USDC keeps its last balance, OP is not known yet
+    assert sorted((balance.token.symbol, balance.balance) for balance in balances) == [
+        ("ETH", 0.0), ("USDC", 100.0), ("WETH", 1.0)
+    ]
+    assert tracker.last_block is None
+
+    chain.failing = set()
+    await tracker.refresh(chain, get_tokens, get_prices)
+    assert chain.sweeps == 2
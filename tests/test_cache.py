@@ -0,0 +1,65 @@
+import json
+import pytest
+from dromadaire.cache import PoolCache, TokenCache, TokenSnapshot
+from tests.fakes import create_mock_pools
+
+
+def test_pool_cache_round_trips_pools_as_plain_data():
+    pools = create_mock_pools()
+    cache = PoolCache()
+    cache.save("10", pools)
+
+    loaded = cache.load("10").pools
+
+    assert loaded == pools
+    assert [pool.token1.symbol for pool in loaded] == ["USDC", "USDC"]
+    # Pools holding the same token share one instance again
+    assert loaded[0].token1 is loaded[1].token1 is loaded[1].reserve1.token
+    assert loaded[0].reserve1.price is loaded[1].reserve1.price
+    assert json.loads(cache.path("10").read_text())["chain_id"] == "10"
+
+
+def test_pool_cache_ignores_entries_that_do_not_match_sugar_records():
+    cache = PoolCache()
+    cache.save("10", create_mock_pools())
+    entry = json.loads(cache.path("10").read_text())
+    entry["pools"]["tokens"]["fields"].append("is_native")
+    cache.path("10").write_text(json.dumps(entry))
+
+    assert cache.load("10") is None
+
+    entry["pools"]["tokens"]["fields"].pop()
+    token0 = entry["pools"]["pools"]["fields"].index("token0")
+    entry["pools"]["pools"]["rows"][0][token0] = {"__reduce__": "os.system"}
+    cache.path("10").write_text(json.dumps(entry))
+
+    assert cache.load("10") is None
+
+    entry["pools"]["pools"]["rows"][0][token0] = 7
+    cache.path("10").write_text(json.dumps(entry))
+
+    assert cache.load("10") is None
+    assert cache.load("8453") is None
+
+
+@pytest.mark.asyncio
+async def test_pool_cache_writes_snapshots_of_a_chain_in_order():
+    cache = PoolCache()
+    cache.save_later("10", create_mock_pools())
+    cache.save_later("10", create_mock_pools()[:1])
+
+    await cache.flush()
+
+    assert [pool.symbol for pool in cache.load("10").pools] == ["WETH/USDC"]
+
+
+def test_token_cache_round_trips_tokens():
+    tokens = [create_mock_pools()[0].token0, create_mock_pools()[0].token1]
+    TokenCache().save(TokenSnapshot(chain_id="10", fetched_at=1.0, tokens=tokens))
+
+    snapshot = TokenCache().load("10")
+
+    assert snapshot.fetched_at == 1.0
+    assert [(token.symbol, token.decimals, token.listed) for token in snapshot.tokens] == [
+        ("WETH", 18, True), ("USDC", 6, True)
+    ]
@@ -0,0 +1,127 @@
+import pytest
+from types import SimpleNamespace
+from dromadaire.confiture import AsyncChain, BalanceCalls, MULTICALL3_ADDRESS, encode_balance_of
+from dromadaire.pipeline import CHAIN_LIMITS, ChainLimits
+from tests.fakes import create_mock_wallet_address, mock_tokens
+
+
+class FakeCall:
+    def __init__(self, result):
+        self.result = result
+
+    async def call(self):
+        return self.result
+
+
+class FakeWeb3:
+    """Serves canned balances through Multicall3 or single `eth_call`s"""
+    def __init__(self, balances, multicall=True):
+        self.balances = balances
+        self.multicall = multicall
+        self.calls = []
+        self.checksums = 0
+        # Tokens whose multicalls fail as a whole
+        self.broken = set()
+        self.eth = SimpleNamespace(
+            get_code=self.get_code, contract=self.contract, call=self.eth_call, get_balance=self.get_balance
+        )
+
+    async def get_balance(self, address):
+        return 0
+
+    def from_wei(self, value, unit):
+        return value / 10 ** 18
+
+    async def get_code(self, address):
+        return b"\x01" if self.multicall and address == MULTICALL3_ADDRESS else b""
+
+    def to_checksum_address(self, address):
+        self.checksums += 1
+        return address
+
+    async def eth_call(self, transaction):
+        self.calls.append("eth_call")
+        if transaction["to"] not in self.balances:
+            raise RuntimeError("execution reverted")
+        return self.balances[transaction["to"]].to_bytes(32, "big")
+
+    def contract(self, address, abi):
+        def aggregate3(calls):
+            self.calls.append("aggregate3")
+            if any(target in self.broken for target, _, _ in calls):
+                raise RuntimeError("execution reverted")
+            return FakeCall([
+                (target in self.balances, self.balances.get(target, 0).to_bytes(32, "big"))
+                for target, _, _ in calls
+            ])
+
+        return SimpleNamespace(functions=SimpleNamespace(aggregate3=aggregate3))
+
+
+def fake_chain(web3):
+    chain = SimpleNamespace(chain_id="10", name="Optimism", web3=web3)
+    for method in (
+        "has_multicall", "multicall_balances", "single_call_balances", "process_token_batch",
+        "get_token_balances", "get_eth_balance",
+    ):
+        setattr(chain, method, getattr(AsyncChain, method).__get__(chain))
+    return chain
+
+
+@pytest.mark.parametrize("multicall,calls", [
+    (True, ["aggregate3"]),
+    (False, ["eth_call"] * 3),
+])
+@pytest.mark.asyncio
+async def test_token_batch_balances_use_multicall_where_deployed(multicall, calls):
+    weth, usdc, op = mock_tokens()
+    web3 = FakeWeb3({weth.token_address: 2 * 10 ** 18, usdc.token_address: 5 * 10 ** 6}, multicall=multicall)
+
+    balances = await fake_chain(web3).process_token_batch([weth, op, usdc], create_mock_wallet_address())
+
+    assert [(balance.token.symbol, balance.balance) for balance in balances] == [("WETH", 2.0), ("USDC", 5.0)]
+    assert web3.calls == calls
+
+
+@pytest.mark.asyncio
+async def test_balance_calls_are_prepared_once_per_chain():
+    tokens = mock_tokens()
+    web3 = FakeWeb3({token.token_address: 1 for token in tokens})
+    calls = BalanceCalls()
+
+    for _ in range(3):
+        await fake_chain(web3).process_token_batch(tokens, create_mock_wallet_address(), calls=calls)
+
+    assert web3.checksums == len(tokens)
+    assert web3.calls == ["aggregate3"] * 3
+
+
+def test_balance_of_calldata():
+    calldata = encode_balance_of(create_mock_wallet_address())
+    assert calldata[:4].hex() == "70a08231"
+    assert len(calldata) == 36
+
+
+@pytest.mark.asyncio
+async def test_token_balances_report_batches_that_kept_failing(monkeypatch):
+    monkeypatch.setitem(CHAIN_LIMITS, "10", ChainLimits(batch_size=1))
+    weth, usdc, op = tokens = mock_tokens()
+    web3 = FakeWeb3({token.token_address: 10 ** 18 for token in tokens})
+    web3.broken = {op.token_address}
+    failed = []
+
+    async def get_tokens():
+        return tokens
+
+    async def get_prices(tokens):
+        return []
+
+    balances = await fake_chain(web3).get_token_balances(
+        create_mock_wallet_address(),
+        get_tokens=get_tokens,
+        get_prices=get_prices,
+        on_failure=lambda batch, error: failed.append(batch),
+    )
+
+    assert [balance.token.symbol for balance in balances] == ["ETH", "WETH", "USDC"]
+    assert failed == [[op]]
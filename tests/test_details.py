@@ -0,0 +1,61 @@
+import asyncio
+import pytest
+from dataclasses import replace
+from dromadaire.details import PoolDetailsLoader
+from dromadaire.state import AppState
+from tests.fakes import FakeChain, create_mock_pool_epoch, create_mock_pools
+
+
+@pytest.mark.asyncio
+async def test_pool_details_are_fetched_once_and_expire():
+    fetched = []
+
+    async def fetch(pool):
+        fetched.append(pool.lp)
+        await asyncio.sleep(0.01)
+        return pool.symbol
+
+    loader = PoolDetailsLoader(fetch)
+    pool = create_mock_pools()[0]
+
+    assert await asyncio.gather(loader.load(pool), loader.load(pool)) == ["WETH/USDC", "WETH/USDC"]
+    assert loader.get(pool) == "WETH/USDC"
+    assert fetched == [pool.lp]
+
+    loader.ttl = 0
+    await asyncio.sleep(0.001)
+    assert loader.get(pool) is None
+    await loader.load(pool)
+    assert fetched == [pool.lp, pool.lp]
+
+
+@pytest.mark.asyncio
+async def test_prefetch_fills_cache_and_ignores_failures():
+    async def fetch(pool):
+        if pool.symbol == "OP/USDC":
+            raise RuntimeError("rpc down")
+        return pool.symbol
+
+    loader = PoolDetailsLoader(fetch)
+    weth_usdc, op_usdc = create_mock_pools()
+
+    await loader.prefetch([weth_usdc, op_usdc])
+
+    assert loader.has(weth_usdc)
+    assert not loader.has(op_usdc)
+
+
+@pytest.mark.asyncio
+async def test_pool_details_hold_the_latest_epoch_of_any_pool():
+    weth_usdc, op_usdc = create_mock_pools()
+    latest = create_mock_pool_epoch(weth_usdc)
+    chain = FakeChain("10", pools=[weth_usdc, op_usdc])
+    chain.epochs = [replace(latest, ts=latest.ts - 7 * 24 * 60 * 60), latest]
+    app_state = AppState()
+    app_state.chains = [chain]
+
+    details = await app_state.fetch_pool_details(weth_usdc)
+
+    assert details.epoch is latest
+    assert details.cl_state is None
+    assert (await app_state.fetch_pool_details(op_usdc)).epoch is None
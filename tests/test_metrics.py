@@ -0,0 +1,43 @@
+from dataclasses import replace
+from dromadaire.metrics import MetricsEngine
+from tests.fakes import create_mock_pools
+
+
+def test_metrics_price_reserves_fees_and_emissions_in_usd():
+    weth_usdc, op_usdc = create_mock_pools()
+    op_usdc = replace(
+        op_usdc,
+        token1_fees=replace(op_usdc.token1_fees, amount=10 * 10 ** 6),
+        weekly_emissions=replace(op_usdc.weekly_emissions, amount=20 * 10 ** 18),
+        total_supply=2.0,
+        gauge_total_supply=1.0,
+    )
+
+    metrics = MetricsEngine().compute([weth_usdc, op_usdc])
+
+    assert metrics.get(weth_usdc).tvl == 2500 + 2500
+    assert metrics.get(weth_usdc).apr == 0
+    tvl = 2.5 + 2500
+    assert metrics.get(op_usdc).tvl == tvl
+    assert metrics.get(op_usdc).fee_apr == 10 * 52 / tvl * 100
+    # 20 OP a week go to the half of the pool that is staked
+    assert metrics.get(op_usdc).emissions_apr == 20 * 2.5 * 52 / (tvl / 2) * 100
+
+
+def test_metrics_are_recomputed_only_when_pools_or_prices_change():
+    engine = MetricsEngine()
+    pools = create_mock_pools()
+    prices = {}
+
+    metrics = engine.compute(pools, prices)
+    assert engine.compute(pools, prices) is metrics
+    assert engine.compute(pools, {}) == metrics
+
+    weth = ("10", pools[0].token0.token_address.lower())
+    repriced = engine.compute(pools, {weth: 3000.0})
+    assert repriced.get(pools[0]).tvl == 3000 + 2500
+    assert repriced.price_version > metrics.price_version
+
+    reloaded = engine.compute(create_mock_pools(), {weth: 3000.0})
+    assert reloaded is not repriced
+    assert reloaded.price_version == repriced.price_version
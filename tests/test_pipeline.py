@@ -0,0 +1,44 @@
+import asyncio
+import pytest
+from dromadaire.pipeline import AdaptiveLimit, run_pipelined
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limit_grows_on_success_and_halves_on_errors():
+    limit = AdaptiveLimit(initial=2, maximum=4)
+
+    for _ in range(20):
+        async with limit.slot():
+            pass
+    assert limit.limit == 4
+
+    with pytest.raises(RuntimeError):
+        async with limit.slot():
+            raise RuntimeError("429 Too Many Requests")
+    assert limit.limit == 2
+
+
+@pytest.mark.asyncio
+async def test_run_pipelined_bounds_in_flight_calls_and_retries():
+    limit = AdaptiveLimit(initial=2, maximum=2)
+    in_flight, most_in_flight, attempts = 0, 0, {}
+
+    async def worker(item):
+        nonlocal in_flight, most_in_flight
+        attempts[item] = attempts.get(item, 0) + 1
+        in_flight += 1
+        most_in_flight = max(most_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if item == 3 and attempts[item] == 1:
+            raise RuntimeError("flaky")
+        if item == 4:
+            raise RuntimeError("broken")
+        return item * 10
+
+    results = await run_pipelined([1, 2, 3, 4, 5], worker, limit, retries=1)
+
+    assert results[:3] == [10, 20, 30] and results[4] == 50
+    assert isinstance(results[3], RuntimeError)
+    assert most_in_flight == 2
+    assert attempts[3] == 2 and attempts[4] == 2
@@ -0,0 +1,46 @@
+import asyncio
+import pytest
+from dromadaire.confiture import Price
+from dromadaire.prices import PriceService, pool_prices
+from tests.fakes import create_mock_pools, mock_tokens
+
+
+@pytest.mark.asyncio
+async def test_price_service_shares_fetches_and_refills_only_expired_prices():
+    weth, usdc, op = mock_tokens()
+    fetched = []
+
+    async def fetch(chain_id, tokens):
+        fetched.append([token.symbol for token in tokens])
+        await asyncio.sleep(0.01)
+        return [Price(token=token, price=1.0) for token in tokens if token is not op]
+
+    service = PriceService(fetch)
+
+    first, second = await asyncio.gather(
+        service.get_prices("10", [weth, usdc]), service.get_prices("10", [usdc, op])
+    )
+    assert [price.token.symbol for price in first] == ["WETH", "USDC"]
+    assert [price.token.symbol for price in second] == ["USDC"]
+    assert fetched == [["WETH", "USDC"], ["OP"]]
+
+    await service.get_prices("10", [weth, usdc, op])
+    assert len(fetched) == 2
+
+    service._entries[("10", weth.token_address.lower())] = (0.0, 2500.0)
+    await service.get_prices("10", [weth, usdc, op])
+    assert fetched[-1] == ["WETH"]
+
+
+@pytest.mark.asyncio
+async def test_prices_seeded_from_pools_are_not_fetched_again():
+    async def fetch(chain_id, tokens):
+        raise AssertionError("should not fetch")
+
+    service = PriceService(fetch)
+    service.seed(pool_prices(create_mock_pools()))
+
+    prices = await service.get_prices("10", list(mock_tokens()))
+
+    assert [price.price for price in prices] == [2500.0, 1.0, 2.5]
+    assert service.prices[("10", mock_tokens()[2].token_address.lower())] == 2.5
@@ -0,0 +1,94 @@
+from dataclasses import replace
+from dromadaire import search
+from dromadaire.search import PoolSearchIndex, parse_query
+from tests.fakes import create_mock_pools
+
+
+def earning_pools():
+    """Mock pools where OP/USDC has a higher fee and has accrued 100 USDC of fees"""
+    weth_usdc, op_usdc = create_mock_pools()
+    fees = replace(op_usdc.token1_fees, amount=100 * 10 ** 6)
+    return [weth_usdc, replace(op_usdc, pool_fee=0.05, token1_fees=fees)]
+
+
+def test_search_by_address_matches_lp_and_tokens():
+    index = PoolSearchIndex(create_mock_pools())
+
+    usdc_pools = index.search("0x7F5c764cBc14f9669B88837ca1490cCa17c31607")
+    lp_pools = index.search("0x1234567890ABCDEF1234567890abcdef12345678")
+
+    assert [pool.symbol for pool in usdc_pools] == ["WETH/USDC", "OP/USDC"]
+    assert [pool.symbol for pool in lp_pools] == ["WETH/USDC"]
+
+
+def test_search_by_text_matches_symbols_and_chain():
+    index = PoolSearchIndex(create_mock_pools())
+
+    assert [pool.symbol for pool in index.search(" weth ")] == ["WETH/USDC"]
+    assert len(index.search("optimism")) == 2
+    assert index.search("base") == []
+    assert len(index.search("")) == 2
+
+
+def test_search_narrows_from_cached_results():
+    index = PoolSearchIndex(create_mock_pools())
+    index.search("weth")
+
+    # Only pools that matched "weth" need a rescan for "wethusdc"
+    assert list(index.narrowest_cached_match("wethusdc")) == [0]
+    assert index.narrowest_cached_match("usdc") is None
+    # Going back to a recent term is served from the cache
+    assert index.search_term("weth") is index.search_term("weth")
+
+
+def test_search_scores_only_texts_holding_the_term_characters(monkeypatch):
+    index = PoolSearchIndex(create_mock_pools())
+    scored = []
+    score_term = search.score_term
+    monkeypatch.setattr(search, "score_term", lambda term, text: scored.append(text) or score_term(term, text))
+
+    assert index.search_term("wh") == {0: score_term("wh", index.texts[0])}
+    assert index.search_term("zq") == {}
+    # Only WETH/USDC has a "w" and an "h", and no pool has a "z" or a "q"
+    assert scored == [index.texts[0]]
+
+
+def test_search_ranks_fuzzy_matches():
+    index = PoolSearchIndex(create_mock_pools())
+
+    assert [pool.symbol for pool in index.search("wethusdc")] == ["WETH/USDC"]
+    assert [pool.symbol for pool in index.search("opt us")] == ["WETH/USDC", "OP/USDC"]
+    # A whole symbol beats a scattered match ("o..p" in "optimism" and "weth/usdc")
+    assert [pool.symbol for pool in index.search("op")] == ["OP/USDC", "WETH/USDC"]
+    assert [pool.symbol for pool in index.search("usdc", limit=1)] == ["WETH/USDC"]
+
+
+def test_parse_query_separates_filters_from_terms():
+    parsed = parse_query("chain:base stable tvl>1m apr>=5 token:usdc sort:-tvl weth tvl>abc")
+
+    assert parsed.chains == ("base",)
+    assert parsed.tokens == ("usdc",)
+    assert parsed.pool_types == ("stable",)
+    assert parsed.comparisons == (("tvl", ">", 1e6), ("apr", ">=", 5.0))
+    assert parsed.sort == ("tvl", True)
+    assert parsed.terms == ("weth", "tvl>abc")
+
+
+def test_search_filters_and_sorts_on_columns():
+    index = PoolSearchIndex(earning_pools())
+
+    assert [pool.symbol for pool in index.search("chain:opt sort:-apr")] == ["OP/USDC", "WETH/USDC"]
+    assert [pool.symbol for pool in index.search("token:weth volatile")] == ["WETH/USDC"]
+    assert [pool.symbol for pool in index.search("apr>0.01")] == ["OP/USDC"]
+    assert [pool.symbol for pool in index.search("usdc fee<=0.003")] == ["WETH/USDC"]
+    assert index.search("stable") == []
+    assert index.search("chain:base") == []
+
+
+def test_search_applies_requested_sort_unless_query_sorts():
+    index = PoolSearchIndex(earning_pools())
+
+    assert [pool.symbol for pool in index.search("", sort=("apr", True))] == ["OP/USDC", "WETH/USDC"]
+    assert [pool.symbol for pool in index.search("usdc", sort=("pool", False))] == ["OP/USDC", "WETH/USDC"]
+    assert [pool.symbol for pool in index.search("sort:apr", sort=("apr", True))] == ["WETH/USDC", "OP/USDC"]
+    assert index.search("zzz", sort=("tvl", True)) == []
@@ -0,0 +1,218 @@
+import asyncio
+import pytest
+from dromadaire.confiture import Token
+from dromadaire.metrics import price_key
+from dromadaire.pipeline import CHAIN_LIMITS
+from dromadaire.state import AppState, ChainConnections, PoolStore
+from tests.fakes import FakeChain, create_mock_balances, create_mock_pools
+
+
+@pytest.mark.asyncio
+async def test_load_pools_isolates_chain_failures():
+    app_state = AppState()
+    app_state.pool_load_timeout = 0.1
+    app_state.select_chains(["10", "8453", "1135"])
+    app_state.chains = [
+        FakeChain("10", pools=create_mock_pools()),
+        FakeChain("8453", delay=1.0),
+        FakeChain("1135", error=RuntimeError("rpc down")),
+    ]
+
+    pools = await app_state.load_pools()
+
+    assert [pool.lp for pool in pools] == [pool.lp for pool in create_mock_pools()]
+    assert set(app_state.pool_errors) == {"8453", "1135"}
+    assert isinstance(app_state.pool_errors["8453"], TimeoutError)
+
+
+@pytest.mark.asyncio
+async def test_iter_pools_yields_chains_as_they_finish():
+    app_state = AppState()
+    app_state.chains = [
+        FakeChain("10", pools=create_mock_pools(), delay=0.05),
+        FakeChain("1135"),
+    ]
+
+    chunks = [(chunk.chain_id, len(chunk.pools)) async for chunk in app_state.iter_pools()]
+
+    assert chunks == [("1135", 0), ("10", 2)]
+
+
+@pytest.mark.asyncio
+async def test_iter_pools_serves_cached_pools_before_revalidating():
+    app_state = AppState()
+    app_state.pool_cache.save("10", create_mock_pools())
+    app_state.chains = [FakeChain("10", pools=create_mock_pools()[:1], delay=0.05)]
+
+    chunks = [(chunk.stale, len(chunk.pools)) async for chunk in app_state.iter_pools()]
+
+    assert chunks == [(True, 2), (False, 1)]
+    await app_state.pool_cache.flush()
+    assert len(app_state.pool_cache.load("10").pools) == 1
+
+
+@pytest.mark.asyncio
+async def test_load_pools_falls_back_to_cached_pools_on_error():
+    app_state = AppState()
+    app_state.pool_cache.save("10", create_mock_pools())
+    app_state.chains = [FakeChain("10", error=RuntimeError("rpc down"))]
+
+    pools = await app_state.load_pools()
+
+    assert len(pools) == 2
+    assert "10" in app_state.pool_errors
+
+
+@pytest.mark.asyncio
+async def test_chain_selection_changes_only_fetch_added_chains():
+    app_state = AppState()
+    app_state.chains = [FakeChain("10", pools=create_mock_pools()), FakeChain("1135")]
+    await app_state.load_pools()
+    assert app_state.unloaded_chains() == []
+
+    app_state.select_chains(["10", "1135", "8453"])
+    assert app_state.unloaded_chains() == ["8453"]
+
+    app_state.select_chains(["1135"])
+    assert app_state.pools == []
+    assert app_state.unloaded_chains() == []
+
+
+@pytest.mark.asyncio
+async def test_chain_connections_are_reused_until_deselected():
+    entered, exited = [], []
+
+    class CountingChain(FakeChain):
+        async def __aenter__(self):
+            entered.append(self.chain_id)
+            return self
+
+        async def __aexit__(self, *args):
+            exited.append(self.chain_id)
+
+    app_state = AppState()
+    app_state.chains = [CountingChain("10"), CountingChain("1135")]
+    await app_state.load_pools()
+    await app_state.load_pools()
+    assert sorted(entered) == ["10", "1135"]
+
+    app_state.select_chains(["10"])
+    await asyncio.sleep(0)
+    assert exited == ["1135"]
+
+    await app_state.connections.close_all()
+    assert sorted(exited) == ["10", "1135"]
+
+
+def test_chain_connections_keep_endpoint_limits_and_balance_calls():
+    connections = ChainConnections()
+    optimism = FakeChain("10")
+
+    assert connections.balance_calls("10") is connections.balance_calls("10")
+    assert connections.balance_calls("10") is not connections.balance_calls("1135")
+    assert connections.balance_calls("10") is not ChainConnections().balance_calls("10")
+
+    assert connections.endpoint_limit(optimism) is connections.endpoint_limit(FakeChain("10"))
+    assert connections.endpoint_limit(optimism) is not connections.endpoint_limit(FakeChain("1135"))
+    assert connections.endpoint_limit(optimism) is not ChainConnections().endpoint_limit(optimism)
+    assert connections.endpoint_limit(optimism).maximum == CHAIN_LIMITS["10"].max_in_flight
+
+
+@pytest.mark.asyncio
+async def test_pool_version_changes_when_chain_pools_are_replaced():
+    app_state = AppState()
+    app_state.chains = [FakeChain("10", pools=create_mock_pools()), FakeChain("1135")]
+    await app_state.load_pools()
+    pool = app_state.pools[0]
+    version = app_state.pool_version(pool)
+
+    app_state.set_chain_pools("1135", [])
+    assert app_state.pool_version(pool) == version
+
+    await app_state.load_pools()
+    assert app_state.pool_version(app_state.pools[0]) > version
+
+
+@pytest.mark.asyncio
+async def test_search_index_keeps_text_indexes_when_prices_change():
+    app_state = AppState()
+    app_state.chains = [FakeChain("10", pools=create_mock_pools())]
+    await app_state.load_pools()
+    index = app_state.search_index
+    weth_matches = index.search_term("weth")
+    assert app_state.filter_pools(app_state.pools, "", sort=("tvl", True))[0].symbol == "WETH/USDC"
+
+    op = app_state.pools[1].token0
+    app_state.price_service.store({price_key(op): 1e9})
+
+    assert app_state.search_index is index
+    assert index.search_term("weth") is weth_matches
+    assert app_state.filter_pools(app_state.pools, "", sort=("tvl", True))[0].symbol == "OP/USDC"
+
+    app_state.set_chain_pools("10", create_mock_pools())
+    assert app_state.search_index is not index
+
+
+def test_pool_store_indexes_pools_by_lp_chain_token_and_pair():
+    store = PoolStore()
+    weth_usdc, op_usdc = create_mock_pools()
+    store.replace_chain("10", [weth_usdc, op_usdc])
+    usdc = weth_usdc.token1.token_address
+
+    assert store.get(weth_usdc.lp.upper()) is weth_usdc
+    assert store.chain_pools("10") == [weth_usdc, op_usdc]
+    assert store.token_pools(usdc) == [weth_usdc, op_usdc]
+    assert store.pair_pools(usdc, weth_usdc.token0.token_address) == [weth_usdc]
+
+    store.delete(weth_usdc.lp)
+    assert store.get(weth_usdc.lp) is None
+    assert store.token_pools(usdc) == [op_usdc]
+    assert store.pair_pools(usdc, weth_usdc.token0.token_address) == []
+
+    store.drop_chain("10")
+    assert store.by_lp == {} and store.by_token == {} and store.by_pair == {}
+
+
+@pytest.mark.asyncio
+async def test_iter_balances_streams_batches_and_reports_failed_chains():
+    balances = create_mock_balances()
+    app_state = AppState()
+    app_state.chains = [FakeChain("10"), FakeChain("1135")]
+
+    async def get_chain_balances(chain, on_batch=None):
+        if chain.chain_id == "1135":
+            raise RuntimeError("rpc down")
+        on_batch(balances[:1])
+        await asyncio.sleep(0)
+        on_batch(balances[1:])
+        return balances
+
+    app_state.get_chain_balances = get_chain_balances
+    chunks = [chunk async for chunk in app_state.iter_balances()]
+
+    optimism = [(len(chunk.balances), chunk.done) for chunk in chunks if chunk.chain_id == "10"]
+    assert optimism == [(1, False), (2, False), (0, True)]
+    lisk = [chunk for chunk in chunks if chunk.chain_id == "1135"]
+    assert len(lisk) == 1 and isinstance(lisk[0].error, RuntimeError)
+    assert len(await app_state.get_balances()) == 3
+
+
+@pytest.mark.asyncio
+async def test_price_refills_always_include_native_and_stable_tokens():
+    weth_usdc, op_usdc = create_mock_pools()
+    eth = Token(
+        chain_id="10", chain_name="Optimism", token_address="ETH", symbol="ETH", decimals=18,
+        listed=True, wrapped_token_address=weth_usdc.token0.token_address,
+    )
+    chain = FakeChain(
+        "10", pools=[weth_usdc, op_usdc], tokens=[eth, weth_usdc.token0, weth_usdc.token1, op_usdc.token0]
+    )
+    app_state = AppState()
+    app_state.chains = [chain]
+    await app_state.load_pools()
+
+    # Pools priced USDC already, the native token alone is refilled
+    prices = await app_state.price_service.get_prices("10", [eth])
+
+    assert [price.token.symbol for price in prices] == ["ETH"]
+    assert chain.priced == [["ETH", "USDC"]]
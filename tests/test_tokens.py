@@ -0,0 +1,56 @@
+import pytest
+from dataclasses import replace
+from dromadaire.tokens import TokenRegistry
+from tests.fakes import mock_tokens
+
+
+@pytest.mark.asyncio
+async def test_token_registry_is_kept_on_disk():
+    fetched = []
+
+    async def fetch(chain_id):
+        fetched.append(chain_id)
+        return mock_tokens()[:2]
+
+    await TokenRegistry(fetch).get_tokens("10")
+    tokens = await TokenRegistry(fetch).get_tokens("10")
+
+    assert [token.symbol for token in tokens] == ["WETH", "USDC"]
+    assert fetched == ["10"]
+
+
+@pytest.mark.asyncio
+async def test_token_registry_refreshes_for_unknown_pool_tokens_and_shares_instances():
+    fetched = []
+
+    async def fetch(chain_id):
+        fetched.append(chain_id)
+        return mock_tokens()
+
+    registry = TokenRegistry(fetch)
+    weth, usdc, op = mock_tokens()
+    await registry.get_tokens("10", [weth])
+    await registry.get_tokens("10", [replace(op, token_address="0x" + "1" * 40)])
+    assert len(fetched) == 2
+
+    tokens = await registry.get_tokens("10", [weth, usdc])
+    assert tokens[0] is weth and tokens[1] is usdc
+    assert len(fetched) == 2
+
+
+@pytest.mark.asyncio
+async def test_token_registry_replaces_tokens_whose_fields_changed():
+    weth, usdc, op = mock_tokens()
+    renamed = replace(usdc, symbol="USDC.e")
+    lists = [[weth, usdc], [weth, renamed]]
+
+    async def fetch(chain_id):
+        return lists.pop(0)
+
+    registry = TokenRegistry(fetch)
+    registry.max_age = 0
+    await registry.get_tokens("10")
+    tokens = await registry.get_tokens("10", [renamed])
+
+    assert tokens[0] is weth
+    assert tokens[1] is renamed and tokens[1].symbol == "USDC.e"
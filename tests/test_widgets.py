@@ -0,0 +1,264 @@
+import threading
+import pytest
+from contextlib import ExitStack
+from dataclasses import replace
+from unittest.mock import AsyncMock, patch
+from textual.app import App, ComposeResult
+from dromadaire.app import DromadaireApp, PoolDetailsView, Pools
+from dromadaire.metrics import price_key
+from dromadaire.widgets import SyncedDataTable, VirtualTable
+from tests.fakes import (
+    create_mock_balances, create_mock_pools, create_mock_wallet_address, mock_fetch_pool_details,
+    mock_load_chain_pools,
+)
+
+
+@pytest.fixture
+def mock_chains():
+    """Serve the mock pools, pool details and balances instead of talking to chains"""
+    with ExitStack() as stack:
+        stack.enter_context(patch(
+            'dromadaire.state.AppState.load_chain_pools', new=AsyncMock(side_effect=mock_load_chain_pools)
+        ))
+        stack.enter_context(patch(
+            'dromadaire.state.AppState.fetch_pool_details', new=AsyncMock(side_effect=mock_fetch_pool_details)
+        ))
+        stack.enter_context(patch('dromadaire.state.AppState.wallet_address', new=create_mock_wallet_address()))
+        stack.enter_context(patch(
+            'dromadaire.state.AppState.get_balances', new=AsyncMock(return_value=create_mock_balances())
+        ))
+        yield
+
+
+class VirtualTableApp(App):
+    def compose(self) -> ComposeResult:
+        yield VirtualTable(columns=[("Name", 8)], row_key=lambda row: row, row_cells=lambda row: [row])
+
+
+class SyncedDataTableApp(App):
+    def compose(self) -> ComposeResult:
+        yield SyncedDataTable()
+
+    def on_mount(self) -> None:
+        self.query_one(SyncedDataTable).add_columns("Name", "Value")
+
+
+def table_rows(table: SyncedDataTable) -> list:
+    return [(row.key.value, *table.get_row(row.key)) for row in table.ordered_rows]
+
+
+async def loaded_pools(pilot) -> Pools:
+    await pilot.app.workers.wait_for_complete()
+    await pilot.pause()
+    return pilot.app.query_one(Pools)
+
+
+@pytest.mark.asyncio
+async def test_pools_switch_tables_at_the_virtual_table_threshold(mock_chains, monkeypatch):
+    monkeypatch.setattr(Pools, "virtual_table_threshold", 1)
+    async with DromadaireApp().run_test() as pilot:
+        pools = await loaded_pools(pilot)
+        virtual_table = pools.query_one("#pools-virtual-table", VirtualTable)
+
+        assert pools.active_table() is virtual_table
+        assert virtual_table.row_count == 2
+        assert pools.query_one("#pools-table").row_count == 0
+
+        monkeypatch.setattr(Pools, "virtual_table_threshold", 2)
+        pools.update_table_with_pools(pools.all_pools)
+        await pilot.pause()
+
+        assert pools.active_table().id == "pools-table"
+        assert pools.active_table().row_count == 2
+        assert virtual_table.row_count == 0 and virtual_table.has_class("hidden")
+
+
+@pytest.mark.asyncio
+async def test_virtual_table_cursor_keeps_its_row_across_new_rows():
+    async with VirtualTableApp().run_test() as pilot:
+        table = pilot.app.query_one(VirtualTable)
+        table.set_rows(["a", "b", "c"])
+        table.move_cursor(2)
+        await pilot.pause()
+
+        table.set_rows(["c", "a", "b"])
+        assert table.cursor_row == 0 and table.highlighted_row_key() == "c"
+        assert table.get_row_index("b") == 2 and table.get_row_index("z") is None
+
+        table.set_rows(["x", "a"])
+        assert table.cursor_row == 0 and table.highlighted_row_key() == "x"
+
+        table.set_rows([])
+        assert table.highlighted_row_key() is None
+
+
+@pytest.mark.asyncio
+async def test_virtual_table_highlights_reach_the_pool_details(mock_chains, monkeypatch):
+    monkeypatch.setattr(Pools, "virtual_table_threshold", 1)
+    async with DromadaireApp().run_test() as pilot:
+        pools = await loaded_pools(pilot)
+        details = pilot.app.query_one(PoolDetailsView)
+        assert pools.active_table().has_focus
+        assert details.current_pool is pools.shown_pools[0]
+
+        await pilot.press("down")
+        await pilot.pause()
+
+        assert details.current_pool is pools.shown_pools[1]
+        assert "OP / USDC" in str(details.query_one("#pool-details-content").render())
+
+
+@pytest.mark.asyncio
+async def test_synced_data_table_applies_added_removed_and_reordered_rows():
+    async with SyncedDataTableApp().run_test() as pilot:
+        table = pilot.app.query_one(SyncedDataTable)
+        table.sync_rows([("a", ("A", "1")), ("b", ("B", "2")), ("c", ("C", "3"))])
+        table.move_cursor(row=1)
+        await pilot.pause()
+
+        table.sync_rows([("d", ("D", "4")), ("c", ("C", "30")), ("b", ("B", "2"))])
+
+        assert table_rows(table) == [("d", "D", "4"), ("c", "C", "30"), ("b", "B", "2")]
+        assert table.highlighted_row_key() == "b"
+
+        table.sync_rows([("b", ("B", "2")), ("a", ("A", "1"))])
+
+        assert table_rows(table) == [("b", "B", "2"), ("a", "A", "1")]
+        assert table.highlighted_row_key() == "b"
+
+
+@pytest.mark.asyncio
+async def test_synced_data_table_rebuilds_past_max_row_removals(monkeypatch):
+    async with SyncedDataTableApp().run_test() as pilot:
+        table = pilot.app.query_one(SyncedDataTable)
+        table.max_row_removals = 2
+        table.sync_rows([(key, (key.upper(), key)) for key in "abcde"])
+        table.move_cursor(row=4)
+        await pilot.pause()
+
+        removed = []
+        original_remove_row = table.remove_row
+        monkeypatch.setattr(table, "remove_row", lambda key: removed.append(key) or original_remove_row(key))
+        table.sync_rows([("e", ("E", "e")), ("d", ("D", "d"))])
+
+        assert removed == []
+        assert table_rows(table) == [("e", "E", "e"), ("d", "D", "d")]
+        assert table.highlighted_row_key() == "e"
+
+        table.sync_rows([("e", ("E", "e"))])
+        assert len(removed) == 1
+        assert table_rows(table) == [("e", "E", "e")]
+
+
+@pytest.mark.asyncio
+async def test_pool_details_show_the_latest_epoch(mock_chains):
+    async with DromadaireApp().run_test() as pilot:
+        await loaded_pools(pilot)
+        await pilot.app.workers.wait_for_complete()
+        await pilot.pause()
+
+        text = str(pilot.app.query_one("#pool-details-content").render())
+        gauge, fees = text.split("⛽ Gauge:")[1].split("💸 Fees This Epoch:")
+
+        assert "Last Epoch (Oct 16):\nVotes: 1,500,000.00\nEmissions: 2,500.00 OP" in gauge
+        assert "Incentives: $125.00\n  OP: 50.0000" in gauge
+        assert "Last Epoch Fees: $50.00\n  WETH: 0.0100\n  USDC: 25.0000" in fees
+
+
+@pytest.mark.asyncio
+async def test_pool_search_runs_once_per_typing_burst_and_drops_stale_results(mock_chains, monkeypatch):
+    monkeypatch.setattr(Pools, "search_debounce", 0.2)
+    async with DromadaireApp().run_test() as pilot:
+        pools = await loaded_pools(pilot)
+        app_state = pilot.app.state
+        filter_pools, searched, release = app_state.filter_pools, [], threading.Event()
+
+        def blocking_filter_pools(all_pools, query, sort=None):
+            searched.append(query)
+            # Hold the first search back until a newer one has been shown
+            if query == "usd":
+                release.wait(timeout=5)
+            return filter_pools(all_pools, query, sort=sort)
+
+        monkeypatch.setattr(app_state, "filter_pools", blocking_filter_pools)
+        await pilot.press("s", "u", "s", "d")
+        await pilot.pause(0.4)
+        assert searched == ["usd"]
+
+        await pilot.press("backspace", "backspace", "backspace", "w", "e", "t", "h")
+        await pilot.pause(0.4)
+        assert searched == ["usd", "weth"]
+        assert [pool.symbol for pool in pools.shown_pools] == ["WETH/USDC"]
+
+        release.set()
+        await pilot.app.workers.wait_for_complete()
+        await pilot.pause()
+        assert [pool.symbol for pool in pools.shown_pools] == ["WETH/USDC"]
+
+
+@pytest.mark.asyncio
+async def test_formatted_pool_rows_follow_price_and_pool_changes(mock_chains):
+    async with DromadaireApp().run_test() as pilot:
+        pools = await loaded_pools(pilot)
+        app_state = pilot.app.state
+        weth_usdc = app_state.pools[0]
+        assert pools.format_pool_row(weth_usdc)[1] == "$5,000.00"
+
+        app_state.price_service.store({price_key(weth_usdc.token0): 3000.0})
+        assert pools.format_pool_row(weth_usdc)[1] == "$5,500.00"
+
+        # Same LP, new chain data: 2 WETH instead of 1
+        reloaded = replace(weth_usdc, reserve0=replace(weth_usdc.reserve0, amount=2 * 10 ** 18))
+        app_state.set_chain_pools("10", [reloaded, *app_state.pools[1:]])
+        assert pools.format_pool_row(reloaded)[1] == "$8,500.00"
+
+
+def numbered_pools(count: int) -> list:
+    """`count` copies of the mock pools with their own LP addresses, WETH/USDC and OP/USDC in turns"""
+    mock_pools = create_mock_pools()
+    return [replace(mock_pools[index % 2], lp=f"0x{index + 1:040x}") for index in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_pool_details_render_once_for_a_burst_of_cursor_moves(mock_chains, monkeypatch):
+    async with DromadaireApp().run_test() as pilot:
+        pools = await loaded_pools(pilot)
+        pilot.app.state.set_chain_pools("10", numbered_pools(6))
+        pools.show_pools()
+        await pilot.pause()
+        rendered = []
+        monkeypatch.setattr(pilot.app.query_one(PoolDetailsView), "update_pool_details", rendered.append)
+
+        table = pools.active_table()
+        for _ in range(4):
+            table.action_cursor_down()
+        await pilot.pause()
+
+        assert table.cursor_row == 4
+        assert [pool.lp for pool in rendered] == [pools.shown_pools[4].lp]
+
+
+@pytest.mark.asyncio
+async def test_sorting_keeps_the_cursor_on_the_same_pool(mock_chains):
+    async with DromadaireApp().run_test() as pilot:
+        pools = await loaded_pools(pilot)
+        table = pools.active_table()
+
+        def shown():
+            return [pool.symbol for pool in pools.shown_pools]
+
+        assert shown() == ["WETH/USDC", "OP/USDC"] and table.cursor_row == 0
+
+        await pilot.press("p")
+        assert shown() == ["OP/USDC", "WETH/USDC"]
+        assert pools.shown_pools[table.cursor_row].symbol == "WETH/USDC"
+
+        # The TVL header starts after the pool column and its padding
+        pool_column = table.ordered_columns[0].get_render_width(table)
+        await pilot.click(table, offset=(pool_column + 1, 0))
+        assert pools.sort == ("tvl", True)
+        assert shown() == ["WETH/USDC", "OP/USDC"] and table.cursor_row == 0
+
+        await pilot.click(table, offset=(pool_column + 1, 0))
+        assert pools.sort == ("tvl", False)
+        assert shown() == ["OP/USDC", "WETH/USDC"] and table.cursor_row == 1